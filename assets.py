@@ -0,0 +1,77 @@
+# Lazily loaded window, fonts and images shared by pacman.py and game_manager.py.
+# Nothing here runs on import: the display is opened by the first get_screen() call and
+# fonts and images are loaded the first time they are asked for. Scaled images are also
+# written to CACHE_DIR so later starts load the small copy instead of scaling again.
+import os
+from collections import OrderedDict
+import pygame
+
+WIDTH = 900
+HEIGHT = 950
+FONT_FILE = 'freesansbold.ttf'
+CACHE_DIR = os.path.join('assets', '.cache')
+
+screen = None
+# loaded fonts keyed by size, scaled images keyed by (path, size)
+fonts = {}
+images = {}
+# rendered text keyed by (text, size, color) with LRU eviction, shared by the menus and the game
+texts = OrderedDict()
+TEXT_CACHE_SIZE = 256
+
+
+def get_screen():
+    global screen
+    if screen is None:
+        pygame.init()
+        screen = pygame.display.set_mode([WIDTH, HEIGHT])
+    return screen
+
+
+def get_font(size):
+    if size not in fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        fonts[size] = pygame.font.Font(FONT_FILE, size)
+    return fonts[size]
+
+
+def render_text(text, size, color):
+    key = (text, size, color)
+    if key in texts:
+        texts.move_to_end(key)
+        return texts[key]
+    surface = get_font(size).render(text, True, color)
+    texts[key] = surface
+    if len(texts) > TEXT_CACHE_SIZE:
+        texts.popitem(last=False)
+    return surface
+
+
+def cache_path(path, size):
+    name, ext = os.path.splitext(path.replace(os.sep, '_').replace('/', '_'))
+    return os.path.join(CACHE_DIR, f'{name}_{size[0]}x{size[1]}{ext}')
+
+
+def load_scaled(path, size):
+    # use the pre-scaled copy when it is newer than the source image
+    cached = cache_path(path, size)
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return pygame.image.load(cached)
+    image = pygame.transform.scale(pygame.image.load(path), size)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pygame.image.save(image, cached)
+    except (OSError, pygame.error):
+        pass # a read-only install just scales on every start
+    return image
+
+
+def get_image(path, size):
+    key = (path, size)
+    if key not in images:
+        image = load_scaled(path, size)
+        if screen is not None:
+            image = image.convert_alpha()
+        images[key] = image
+    return images[key]
@@ -1,36 +1,37 @@
 import pygame
 import pacman
+from assets import render_text
+from simulation import level_settings
+from particles import ParticleField, PARTICLE_TIERS
 import json
 import os
 import sys
 import math
-import random
-
-# Initialize Pygame
-pygame.init()
 
 # Constants
 WIDTH = 900
 HEIGHT = 950
-screen = pacman.screen
-font = pygame.font.Font('freesansbold.ttf', 32)
-small_font = pygame.font.Font('freesansbold.ttf', 20)
-title_font = pygame.font.Font('freesansbold.ttf', 90)
-sub_font = pygame.font.Font('freesansbold.ttf', 30)
-btn_font = pygame.font.Font('freesansbold.ttf', 32)
-footer_font = pygame.font.Font('freesansbold.ttf', 16)
-version_font = pygame.font.Font('freesansbold.ttf', 13)
-info_font = pygame.font.Font('freesansbold.ttf', 28)
-credit_font = pygame.font.Font('freesansbold.ttf', 22)
-desc_font = pygame.font.Font('freesansbold.ttf', 20)
-section_font = pygame.font.Font('freesansbold.ttf', 24)
-inst_font = pygame.font.Font('freesansbold.ttf', 18)
-score_font = pygame.font.Font('freesansbold.ttf', 32)
-large_score_font = pygame.font.Font('freesansbold.ttf', 40)
-prompt_font = pygame.font.Font('freesansbold.ttf', 28)
-input_font = pygame.font.Font('freesansbold.ttf', 45)
-level_font = pygame.font.Font('freesansbold.ttf', 80)
-header_font = pygame.font.Font('freesansbold.ttf', 50)
+# opened by GameManager, importing this module does not create a window
+screen = None
+# Font sizes, the fonts are loaded on first use by assets.get_font
+font = 32
+small_font = 20
+title_font = 90
+sub_font = 30
+btn_font = 32
+footer_font = 16
+version_font = 13
+info_font = 28
+credit_font = 22
+desc_font = 20
+section_font = 24
+inst_font = 18
+score_font = 32
+large_score_font = 40
+prompt_font = 28
+input_font = 45
+level_font = 80
+header_font = 50
 
 # Colors
 WHITE = (255, 255, 255)
@@ -42,6 +43,7 @@ CYBER_YELLOW = (252, 238, 10)
 CYBER_BLUE = (0, 240, 255)
 CYBER_PINK = (255, 0, 60)
 DARK_BG = (5, 5, 10)
+LAYER_KEY = (255, 0, 255) # transparent color of the pre-rendered background layers
 
 # States
 STATE_MENU = 1
@@ -55,8 +57,27 @@ STATE_ABOUT = 8
 
 HIGH_SCORE_FILE = "high_scores.json"
 
+# Menu widgets: panels are pre-rendered with this much room around them for the border
+PANEL_MARGIN = 4
+
+# Background particle count: 'low', 'medium' or 'high' (see particles.PARTICLE_TIERS)
+PARTICLE_TIER = 'low'
+
+# Ghosts added to the usual four in every level (swarm mode), 0 plays the classic game
+EXTRA_GHOSTS = 0
+
+# Menu frame pacing: animate at MENU_FPS while someone is using the menus. After
+# MENU_IDLE_MS without input the animation freezes and the loop sleeps in event.wait,
+# waking every IDLE_WAIT_MS at most (the name entry cursor still blinks)
+MENU_FPS = 60
+MENU_IDLE_MS = 20000
+IDLE_WAIT_MS = 500
+INPUT_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN, pygame.KEYUP)
+
 class GameManager:
     def __init__(self):
+        global screen
+        screen = pacman.init_display()
         self.state = STATE_MENU
         self.running = True
         self.high_scores = self.load_high_scores()
@@ -64,17 +85,33 @@ class GameManager:
         self.current_level = 1
         self.current_lives = 3
         self.input_name = ""
+        self.clock = pygame.time.Clock()
+        self.last_input = pygame.time.get_ticks()
         
         # Background Particles
-        self.particles = []
-        for i in range(50):
-            self.particles.append({
-                'x': random.randint(0, WIDTH),
-                'y': random.randint(0, HEIGHT),
-                'speed': random.uniform(0.2, 1.5),
-                'size': random.randint(2, 4),
-                'color': random.choice([CYBER_BLUE, CYBER_PINK, CYBER_YELLOW, (50, 50, 50)])
-            })
+        self.particles = ParticleField(PARTICLE_TIERS[PARTICLE_TIER], WIDTH, HEIGHT,
+                                       [CYBER_BLUE, CYBER_PINK, CYBER_YELLOW, (50, 50, 50)])
+
+        # Static background layers, drawn once and blitted with a colorkey every frame
+        self.grid_layer = self.make_layer()
+        grid_color = (20, 25, 35)
+        for x in range(0, WIDTH, 40):
+            pygame.draw.line(self.grid_layer, grid_color, (x, 0), (x, HEIGHT), 1)
+        for y in range(0, HEIGHT, 40):
+            pygame.draw.line(self.grid_layer, grid_color, (0, y), (WIDTH, y), 1)
+        self.scanline_layer = self.make_layer()
+        for y in range(0, HEIGHT, 4):
+            pygame.draw.line(self.scanline_layer, (0, 0, 0), (0, y), (WIDTH, y), 1)
+
+        # Widget cache: finished panels keyed by (size, colors, alpha, border), text comes
+        # from assets.render_text, so menu frames only blit
+        self.panel_cache = {}
+
+    def make_layer(self):
+        layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+        layer.fill(LAYER_KEY)
+        layer.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+        return layer
 
     def load_high_scores(self):
         if os.path.exists(HIGH_SCORE_FILE):
@@ -111,34 +148,27 @@ class GameManager:
                           start_angle, end_angle, 4)
 
         # Cyber Grid
-        grid_color = (20, 25, 35)
-        for x in range(0, WIDTH, 40):
-            pygame.draw.line(screen, grid_color, (x, 0), (x, HEIGHT), 1)
-        for y in range(0, HEIGHT, 40):
-            pygame.draw.line(screen, grid_color, (0, y), (WIDTH, y), 1)
+        screen.blit(self.grid_layer, (0, 0))
             
         # Draw Particles
-        for p in self.particles:
-            p['y'] -= p['speed']
-            if p['y'] < 0:
-                p['y'] = HEIGHT
-                p['x'] = random.randint(0, WIDTH)
-                
-            # Draw particle with alpha
-            # Since pygame.draw doesn't support alpha directly on screen, use a temp surface
-            s = pygame.Surface((p['size'], p['size']), pygame.SRCALPHA)
-            alpha = int(100 + 155 * (p['y'] / HEIGHT)) # Fade out at top
-            s.fill((*p['color'], alpha))
-            screen.blit(s, (p['x'], p['y']))
+        self.particles.update()
+        self.particles.draw(screen)
 
         # Scanlines
-        for y in range(0, HEIGHT, 4):
-            pygame.draw.line(screen, (0, 0, 0), (0, y), (WIDTH, y), 1)
+        screen.blit(self.scanline_layer, (0, 0))
 
     def draw_cyber_panel(self, rect, color=(20, 20, 30), alpha=240, border_color=CYBER_BLUE, border_width=2):
-        # Chamfered corners
+        key = (rect.width, rect.height, color, alpha, border_color, border_width)
+        if key not in self.panel_cache:
+            self.panel_cache[key] = self.render_panel(*key)
+        screen.blit(self.panel_cache[key], (rect.x - PANEL_MARGIN, rect.y - PANEL_MARGIN))
+
+    def render_panel(self, w, h, color, alpha, border_color, border_width):
+        # Chamfered corners, drawn PANEL_MARGIN pixels in so the border has room on every side
         cut = 20
-        x, y, w, h = rect.x, rect.y, rect.width, rect.height
+        m = PANEL_MARGIN
+        panel = pygame.Surface((w + 2 * m, h + 2 * m), pygame.SRCALPHA)
+        x, y = m, m
         
         points = [
             (x + cut, y), (x + w, y), (x + w, y + h - cut),
@@ -146,26 +176,25 @@ class GameManager:
         ]
         
         # Background
-        shape_surf = pygame.Surface((w, h), pygame.SRCALPHA)
         local_points = [
             (cut, 0), (w, 0), (w, h - cut),
             (w - cut, h), (0, h), (0, cut)
         ]
-        pygame.draw.polygon(shape_surf, (*color, alpha), local_points)
-        screen.blit(shape_surf, (x, y))
+        pygame.draw.polygon(panel.subsurface((x, y, w, h)), (*color, alpha), local_points)
         
         # Border
-        pygame.draw.polygon(screen, border_color, points, border_width)
+        pygame.draw.polygon(panel, border_color, points, border_width)
         
         # Tech accents
-        pygame.draw.line(screen, border_color, (x + cut, y + 5), (x + w // 3, y + 5), 1)
-        pygame.draw.line(screen, border_color, (x + w - cut, y + h - 5), (x + w - w // 3, y + h - 5), 1)
+        pygame.draw.line(panel, border_color, (x + cut, y + 5), (x + w // 3, y + 5), 1)
+        pygame.draw.line(panel, border_color, (x + w - cut, y + h - 5), (x + w - w // 3, y + h - 5), 1)
+        return panel
 
     def draw_text_centered(self, text, font, color, y_offset):
-        text_surface = font.render(text, True, color)
+        text_surface = render_text(text, font, color)
         text_rect = text_surface.get_rect(center=(WIDTH // 2, y_offset))
         # Drop shadow
-        shadow = font.render(text, True, (0, 0, 0))
+        shadow = render_text(text, font, (0, 0, 0))
         shadow_rect = shadow.get_rect(center=(WIDTH // 2 + 2, y_offset + 2))
         screen.blit(shadow, shadow_rect)
         screen.blit(text_surface, text_rect)
@@ -178,15 +207,15 @@ class GameManager:
         
         # Glitch layers
         offset_x = 4
-        screen.blit(title_font.render(title_text, True, CYBER_PINK), (WIDTH//2 - 200 + offset_x, 100))
-        screen.blit(title_font.render(title_text, True, CYBER_BLUE), (WIDTH//2 - 200 - offset_x, 100))
+        screen.blit(render_text(title_text, title_font, CYBER_PINK), (WIDTH//2 - 200 + offset_x, 100))
+        screen.blit(render_text(title_text, title_font, CYBER_BLUE), (WIDTH//2 - 200 - offset_x, 100))
         
         # Main Title
-        title_surf = title_font.render(title_text, True, CYBER_YELLOW)
+        title_surf = render_text(title_text, title_font, CYBER_YELLOW)
         screen.blit(title_surf, (WIDTH//2 - 200, 100))
         
         # Subtitle
-        sub_text = sub_font.render("CLASSIC EDITION", True, CYBER_BLUE)
+        sub_text = render_text("CLASSIC EDITION", sub_font, CYBER_BLUE)
         screen.blit(sub_text, (WIDTH//2 - sub_text.get_width()//2, 200))
 
         # Menu Buttons
@@ -214,12 +243,12 @@ class GameManager:
                 text_color = CYBER_BLUE
                 
             # Text
-            text_surf = btn_font.render(f"{btn['icon']}  {btn['text']}", True, text_color)
+            text_surf = render_text(f"{btn['icon']}  {btn['text']}", btn_font, text_color)
             text_rect = text_surf.get_rect(center=rect.center)
             screen.blit(text_surf, text_rect)
 
         # Footer
-        footer = footer_font.render("v2.0 | Remastered UI", True, (100, 100, 150))
+        footer = render_text("v2.0 | Remastered UI", footer_font, (100, 100, 150))
         screen.blit(footer, (WIDTH//2 - footer.get_width()//2, 900))
         
         pygame.display.flip()
@@ -238,12 +267,12 @@ class GameManager:
         y_pos = 200
         
         # Project title
-        project_title = info_font.render("PAC-MAN CYBERPUNK", True, CYBER_BLUE)
+        project_title = render_text("PAC-MAN CYBERPUNK", info_font, CYBER_BLUE)
         screen.blit(project_title, (WIDTH//2 - project_title.get_width()//2, y_pos))
         y_pos += 60
         
         # Team section
-        team_title = info_font.render("DEVELOPMENT TEAM", True, CYBER_YELLOW)
+        team_title = render_text("DEVELOPMENT TEAM", info_font, CYBER_YELLOW)
         screen.blit(team_title, (WIDTH//2 - team_title.get_width()//2, y_pos))
         y_pos += 50
         
@@ -255,7 +284,7 @@ class GameManager:
         ]
         
         for credit in credits:
-            credit_text = credit_font.render(credit, True, (200, 200, 255))
+            credit_text = render_text(credit, credit_font, (200, 200, 255))
             screen.blit(credit_text, (WIDTH//2 - credit_text.get_width()//2, y_pos))
             y_pos += 40
         
@@ -269,7 +298,7 @@ class GameManager:
         ]
         
         for desc in descriptions:
-            desc_text = desc_font.render(desc, True, (180, 180, 200))
+            desc_text = render_text(desc, desc_font, (180, 180, 200))
             screen.blit(desc_text, (WIDTH//2 - desc_text.get_width()//2, y_pos))
             y_pos += 35
         
@@ -285,7 +314,7 @@ class GameManager:
             self.draw_cyber_panel(back_btn_rect, color=(20, 20, 30), border_color=CYBER_PINK)
             text_color = WHITE
             
-        back_text = font.render("BACK", True, text_color)
+        back_text = render_text("BACK", font, text_color)
         back_rect = back_text.get_rect(center=back_btn_rect.center)
         screen.blit(back_text, back_rect)
         
@@ -316,7 +345,7 @@ class GameManager:
                 self.draw_cyber_panel(btn_rect, color=(20, 20, 30), border_color=CYBER_YELLOW)
                 text_color = CYBER_YELLOW
                 
-            text = sub_font.render(lvl["text"], True, text_color)
+            text = render_text(lvl["text"], sub_font, text_color)
             text_rect = text.get_rect(center=btn_rect.center)
             screen.blit(text, text_rect)
             
@@ -331,7 +360,7 @@ class GameManager:
             self.draw_cyber_panel(back_btn_rect, color=(20, 20, 30), border_color=CYBER_PINK)
             text_color = WHITE
             
-        back_text = font.render("BACK", True, text_color)
+        back_text = render_text("BACK", font, text_color)
         back_rect = back_text.get_rect(center=back_btn_rect.center)
         screen.blit(back_text, back_rect)
         
@@ -376,13 +405,13 @@ class GameManager:
         
         for title, lines in sections:
             # Section Title
-            title_surf = section_font.render(title, True, CYBER_PINK)
+            title_surf = render_text(title, section_font, CYBER_PINK)
             screen.blit(title_surf, (100, y_pos))
             y_pos += 35
             
             # Lines
             for line in lines:
-                line_surf = inst_font.render(line, True, (200, 200, 220))
+                line_surf = render_text(line, inst_font, (200, 200, 220))
                 screen.blit(line_surf, (120, y_pos))
                 y_pos += 25
             y_pos += 20
@@ -399,7 +428,7 @@ class GameManager:
             self.draw_cyber_panel(back_btn_rect, color=(20, 20, 30), border_color=CYBER_PINK)
             text_color = WHITE
             
-        back_text = font.render("BACK", True, text_color)
+        back_text = render_text("BACK", font, text_color)
         back_rect = back_text.get_rect(center=back_btn_rect.center)
         screen.blit(back_text, back_rect)
         
@@ -422,22 +451,22 @@ class GameManager:
         y_start = 200
         
         if len(self.high_scores) == 0:
-            no_scores = score_font.render("No high scores yet!", True, (150, 200, 255))
+            no_scores = render_text("No high scores yet!", score_font, (150, 200, 255))
             no_rect = no_scores.get_rect(center=(WIDTH // 2, 350))
             screen.blit(no_scores, no_rect)
         else:
             for i, entry in enumerate(self.high_scores[:5]):
                 # Rank
                 rank_colors = [CYBER_YELLOW, (192, 192, 192), (205, 127, 50), CYBER_BLUE, CYBER_BLUE]
-                rank_text = score_font.render(f"#{i+1}", True, rank_colors[i])
+                rank_text = render_text(f"#{i+1}", score_font, rank_colors[i])
                 screen.blit(rank_text, (WIDTH // 2 - 250, y_start + i * 70))
                 
                 # Name
-                name_text = score_font.render(entry['name'], True, WHITE)
+                name_text = render_text(entry['name'], score_font, WHITE)
                 screen.blit(name_text, (WIDTH // 2 - 150, y_start + i * 70))
                 
                 # Score
-                score_text = score_font.render(str(entry['score']), True, CYBER_PINK)
+                score_text = render_text(str(entry['score']), score_font, CYBER_PINK)
                 score_rect = score_text.get_rect(right=WIDTH // 2 + 250, top=y_start + i * 70)
                 screen.blit(score_text, score_rect)
         
@@ -453,7 +482,7 @@ class GameManager:
             self.draw_cyber_panel(back_btn_rect, color=(20, 20, 30), border_color=CYBER_PINK)
             text_color = WHITE
             
-        back_text = font.render("BACK", True, text_color)
+        back_text = render_text("BACK", font, text_color)
         back_rect = back_text.get_rect(center=back_btn_rect.center)
         screen.blit(back_text, back_rect)
         
@@ -470,12 +499,12 @@ class GameManager:
         self.draw_cyber_panel(panel_rect, border_color=CYBER_PINK)
         
         # Score display
-        score_text = large_score_font.render(f"Score: {self.current_score}", True, CYBER_BLUE)
+        score_text = render_text(f"Score: {self.current_score}", large_score_font, CYBER_BLUE)
         score_rect = score_text.get_rect(center=(WIDTH // 2, 280))
         screen.blit(score_text, score_rect)
         
         # Name entry prompt
-        prompt = prompt_font.render("Enter Your Name (Max 10 chars):", True, WHITE)
+        prompt = render_text("Enter Your Name (Max 10 chars):", prompt_font, WHITE)
         prompt_rect = prompt.get_rect(center=(WIDTH // 2, 380))
         screen.blit(prompt, prompt_rect)
         
@@ -488,12 +517,12 @@ class GameManager:
         if pygame.time.get_ticks() % 1000 < 500:
             display_name += "_"
         
-        name_text = input_font.render(display_name, True, CYBER_YELLOW)
+        name_text = render_text(display_name, input_font, CYBER_YELLOW)
         name_rect = name_text.get_rect(center=input_box.center)
         screen.blit(name_text, name_rect)
         
         # Submit hint
-        hint = small_font.render("Press ENTER to save", True, (150, 200, 255))
+        hint = render_text("Press ENTER to save", small_font, (150, 200, 255))
         hint_rect = hint.get_rect(center=(WIDTH // 2, 550))
         screen.blit(hint, hint_rect)
         
@@ -509,21 +538,10 @@ class GameManager:
         
         while True:
             # Setup level
-            pacman.init_globals()
-            pacman.lives = self.current_lives
-            pacman.score = self.current_score
-            
-            # Determine difficulty and board
-            speed_mult = 1.0 + (self.current_level - 1) * 0.15
+            state = pacman.GameState(self.current_score, self.current_lives, self.current_level)
             
-            # Map level to board: Level 1 -> board1, Level 2 -> board2
-            if self.current_level == 1:
-                board_index = 0  # board1
-            elif self.current_level == 2:
-                board_index = 1  # board2
-            else:
-                # For levels 3+, cycle through boards
-                board_index = (self.current_level - 1) % 2
+            # Determine difficulty and board: level 1 -> board1, level 2 -> board2, then they take turns
+            speed_mult, board_index = level_settings(self.current_level)
             
             # Show Level Screen only for levels 2+
             if self.current_level > 1:
@@ -533,11 +551,12 @@ class GameManager:
                 pygame.time.delay(2000)
             
             # Play Level
-            result = pacman.play_level(speed_mult=speed_mult, board_index=board_index, level_num=self.current_level)
+            result = pacman.play_level(state, speed_mult=speed_mult, extra_ghosts=EXTRA_GHOSTS,
+                                       board_index=board_index)
             
-            # Update stats from pacman module
-            self.current_score = pacman.score
-            self.current_lives = pacman.lives
+            # Update stats from the finished level
+            self.current_score = state.score
+            self.current_lives = state.lives
             
             if result == "QUIT":
                 self.running = False
@@ -574,11 +593,23 @@ class GameManager:
         else:
             self.state = STATE_MENU
 
+    def next_events(self):
+        # Returns the events to handle and whether the current screen should be redrawn
+        if pygame.time.get_ticks() - self.last_input < MENU_IDLE_MS:
+            self.clock.tick(MENU_FPS)
+            return pygame.event.get(), True
+        event = pygame.event.wait(IDLE_WAIT_MS)
+        if event.type == pygame.NOEVENT:
+            return [], self.state == STATE_NEW_HIGHSCORE
+        return [event] + pygame.event.get(), True
+
     def run(self):
         while self.running:
+            events, redraw = self.next_events()
             if self.state == STATE_MENU:
-                self.draw_menu()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_menu()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -627,8 +658,9 @@ class GameManager:
                             self.running = False
             
             elif self.state == STATE_LEVELS:
-                self.draw_levels()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_levels()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -660,8 +692,9 @@ class GameManager:
                             self.state = STATE_MENU
 
             elif self.state == STATE_INSTRUCTIONS:
-                self.draw_instructions()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_instructions()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -674,8 +707,9 @@ class GameManager:
                             self.state = STATE_MENU
                             
             elif self.state == STATE_HIGHSCORES:
-                self.draw_high_scores()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_high_scores()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -688,8 +722,9 @@ class GameManager:
                             self.state = STATE_MENU
 
             elif self.state == STATE_ABOUT:
-                self.draw_about()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_about()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -702,8 +737,9 @@ class GameManager:
                             self.state = STATE_MENU
 
             elif self.state == STATE_NEW_HIGHSCORE:
-                self.draw_new_highscore()
-                for event in pygame.event.get():
+                if redraw:
+                    self.draw_new_highscore()
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     if event.type == pygame.KEYDOWN:
@@ -720,6 +756,9 @@ class GameManager:
                             if len(self.input_name) < 10 and event.unicode.isalnum():
                                 self.input_name += event.unicode.upper()
 
+            if any(event.type in INPUT_EVENTS for event in events):
+                self.last_input = pygame.time.get_ticks()
+
         pygame.quit()
         sys.exit()
 
@@ -1,1486 +1,567 @@
-# Build Pac-Man from Scratch in Python with PyGame!!
-import copy
-from board import boards, all_boards
-import pygame
-import math
-import random
-
-pygame.init()
-
-WIDTH = 900
-HEIGHT = 950
-screen = pygame.display.set_mode([WIDTH, HEIGHT])
-timer = pygame.time.Clock()
-fps = 60
-font = pygame.font.Font('freesansbold.ttf', 20)
-gameover_font = pygame.font.Font('freesansbold.ttf', 40)
-level = copy.deepcopy(boards)
-color = 'blue'
-PI = math.pi
-player_images = []
-for i in range(1, 5):
-    player_images.append(pygame.transform.scale(pygame.image.load(f'assets/player_images/{i}.png'), (45, 45)))
-blinky_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/red.png'), (45, 45))
-pinky_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/pink.png'), (45, 45))
-inky_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/blue.png'), (45, 45))
-clyde_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/orange.png'), (45, 45))
-spooked_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/powerup.png'), (45, 45))
-dead_img = pygame.transform.scale(pygame.image.load(f'assets/ghost_images/dead.png'), (45, 45))
-
-def init_globals():
-    global player_x, player_y, direction, blinky_x, blinky_y, blinky_direction, \
-        inky_x, inky_y, inky_direction, pinky_x, pinky_y, pinky_direction, \
-        clyde_x, clyde_y, clyde_direction, counter, flicker, turns_allowed, \
-        direction_command, player_speed, score, powerup, power_counter, \
-        eaten_ghost, targets, blinky_dead, inky_dead, clyde_dead, pinky_dead, \
-        blinky_box, inky_box, clyde_box, pinky_box, moving, ghost_speeds, \
-        startup_counter, lives, game_over, game_won, level
-    
-    player_x = 450
-    player_y = 663
-    direction = 0
-    blinky_x = 56
-    blinky_y = 58
-    blinky_direction = 0
-    inky_x = 440
-    inky_y = 388
-    inky_direction = 2
-    pinky_x = 440
-    pinky_y = 438
-    pinky_direction = 2
-    clyde_x = 440
-    clyde_y = 438
-    clyde_direction = 2
-    counter = 0
-    flicker = False
-    turns_allowed = [False, False, False, False]
-    direction_command = 0
-    player_speed = 2
-    score = 0
-    powerup = False
-    power_counter = 0
-    eaten_ghost = [False, False, False, False]
-    targets = [(player_x, player_y), (player_x, player_y), (player_x, player_y), (player_x, player_y)]
-    blinky_dead = False
-    inky_dead = False
-    clyde_dead = False
-    pinky_dead = False
-    blinky_box = False
-    inky_box = False
-    clyde_box = False
-    pinky_box = False
-    moving = False
-    ghost_speeds = [2, 2, 2, 2]
-    startup_counter = 0
-    lives = 3
-    game_over = False
-    game_won = False
-    level = copy.deepcopy(boards)
-
-init_globals()
-
-
-class Ghost:
-    def __init__(self, x_coord, y_coord, target, speed, img, direct, dead, box, id):
-        self.x_pos = x_coord
-        self.y_pos = y_coord
-        self.center_x = self.x_pos + 22
-        self.center_y = self.y_pos + 22
-        self.target = target
-        self.speed = speed
-        self.img = img
-        self.direction = direct
-        self.dead = dead
-        self.in_box = box
-        self.id = id
-        self.turns, self.in_box = self.check_collisions()
-        self.rect = self.draw()
-
-    def draw(self):
-        if (not powerup and not self.dead) or (eaten_ghost[self.id] and powerup and not self.dead):
-            screen.blit(self.img, (self.x_pos, self.y_pos))
-        elif powerup and not self.dead and not eaten_ghost[self.id]:
-            screen.blit(spooked_img, (self.x_pos, self.y_pos))
-        else:
-            screen.blit(dead_img, (self.x_pos, self.y_pos))
-        ghost_rect = pygame.rect.Rect((self.center_x - 18, self.center_y - 18), (36, 36))
-        return ghost_rect
-
-    def check_collisions(self):
-        # R, L, U, D
-        num1 = ((HEIGHT - 50) // 32)
-        num2 = (WIDTH // 30)
-        num3 = 15
-        self.turns = [False, False, False, False]
-        if 0 < self.center_x // 30 < 29:
-            if level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] == 9:
-                self.turns[2] = True
-            if level[int(self.center_y // num1)][int((self.center_x - num3) // num2)] < 3 \
-                    or (level[int(self.center_y // num1)][int((self.center_x - num3) // num2)] == 9 and (
-                    self.in_box or self.dead)):
-                self.turns[1] = True
-            if level[int(self.center_y // num1)][int((self.center_x + num3) // num2)] < 3 \
-                    or (level[int(self.center_y // num1)][int((self.center_x + num3) // num2)] == 9 and (
-                    self.in_box or self.dead)):
-                self.turns[0] = True
-            if level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] < 3 \
-                    or (level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] == 9 and (
-                    self.in_box or self.dead)):
-                self.turns[3] = True
-            if level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] < 3 \
-                    or (level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] == 9 and (
-                    self.in_box or self.dead)):
-                self.turns[2] = True
-
-            if self.direction == 2 or self.direction == 3:
-                if 10 <= self.center_x % num2 <= 20:
-                    if level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] < 3 \
-                            or (level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[3] = True
-                    if level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] < 3 \
-                            or (level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[2] = True
-                if 10 <= self.center_y % num1 <= 20:
-                    if level[int(self.center_y // num1)][int((self.center_x - num2) // num2)] < 3 \
-                            or (level[int(self.center_y // num1)][int((self.center_x - num2) // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[1] = True
-                    if level[int(self.center_y // num1)][int((self.center_x + num2) // num2)] < 3 \
-                            or (level[int(self.center_y // num1)][int((self.center_x + num2) // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[0] = True
-
-            if self.direction == 0 or self.direction == 1:
-                if 10 <= self.center_x % num2 <= 20:
-                    if level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] < 3 \
-                            or (level[int((self.center_y + num3) // num1)][int(self.center_x // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[3] = True
-                    if level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] < 3 \
-                            or (level[int((self.center_y - num3) // num1)][int(self.center_x // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[2] = True
-                if 10 <= self.center_y % num1 <= 20:
-                    if level[int(self.center_y // num1)][int((self.center_x - num3) // num2)] < 3 \
-                            or (level[int(self.center_y // num1)][int((self.center_x - num3) // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[1] = True
-                    if level[int(self.center_y // num1)][int((self.center_x + num3) // num2)] < 3 \
-                            or (level[int(self.center_y // num1)][int((self.center_x + num3) // num2)] == 9 and (
-                            self.in_box or self.dead)):
-                        self.turns[0] = True
-        else:
-            self.turns[0] = True
-            self.turns[1] = True
-        if 350 < self.x_pos < 550 and 370 < self.y_pos < 480:
-            self.in_box = True
-        else:
-            self.in_box = False
-        return self.turns, self.in_box
-
-    def move_clyde(self):
-        # r, l, u, d
-        # clyde is going to turn whenever advantageous for pursuit
-        if self.direction == 0:
-            if self.target[0] > self.x_pos and self.turns[0]:
-                self.x_pos += self.speed
-            elif not self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                if self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                else:
-                    self.x_pos += self.speed
-        elif self.direction == 1:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.direction = 3
-            elif self.target[0] < self.x_pos and self.turns[1]:
-                self.x_pos -= self.speed
-            elif not self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                if self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                else:
-                    self.x_pos -= self.speed
-        elif self.direction == 2:
-            if self.target[0] < self.x_pos and self.turns[1]:
-                self.direction = 1
-                self.x_pos -= self.speed
-            elif self.target[1] < self.y_pos and self.turns[2]:
-                self.direction = 2
-                self.y_pos -= self.speed
-            elif not self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                else:
-                    self.y_pos -= self.speed
-        elif self.direction == 3:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.y_pos += self.speed
-            elif not self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                else:
-                    self.y_pos += self.speed
-        if self.x_pos < -30:
-            self.x_pos = 900
-        elif self.x_pos > 900:
-            self.x_pos - 30
-        return self.x_pos, self.y_pos, self.direction
-
-    def move_blinky(self):
-        # r, l, u, d
-        # blinky is going to turn whenever colliding with walls, otherwise continue straight
-        if self.direction == 0:
-            if self.target[0] > self.x_pos and self.turns[0]:
-                self.x_pos += self.speed
-            elif not self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[0]:
-                self.x_pos += self.speed
-        elif self.direction == 1:
-            if self.target[0] < self.x_pos and self.turns[1]:
-                self.x_pos -= self.speed
-            elif not self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[1]:
-                self.x_pos -= self.speed
-        elif self.direction == 2:
-            if self.target[1] < self.y_pos and self.turns[2]:
-                self.direction = 2
-                self.y_pos -= self.speed
-            elif not self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[2]:
-                self.y_pos -= self.speed
-        elif self.direction == 3:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.y_pos += self.speed
-            elif not self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[3]:
-                self.y_pos += self.speed
-        if self.x_pos < -30:
-            self.x_pos = 900
-        elif self.x_pos > 900:
-            self.x_pos - 30
-        return self.x_pos, self.y_pos, self.direction
-
-    def move_inky(self):
-        # r, l, u, d
-        # inky turns up or down at any point to pursue, but left and right only on collision
-        if self.direction == 0:
-            if self.target[0] > self.x_pos and self.turns[0]:
-                self.x_pos += self.speed
-            elif not self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                if self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                else:
-                    self.x_pos += self.speed
-        elif self.direction == 1:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.direction = 3
-            elif self.target[0] < self.x_pos and self.turns[1]:
-                self.x_pos -= self.speed
-            elif not self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                if self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                else:
-                    self.x_pos -= self.speed
-        elif self.direction == 2:
-            if self.target[1] < self.y_pos and self.turns[2]:
-                self.direction = 2
-                self.y_pos -= self.speed
-            elif not self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[2]:
-                self.y_pos -= self.speed
-        elif self.direction == 3:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.y_pos += self.speed
-            elif not self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[3]:
-                self.y_pos += self.speed
-        if self.x_pos < -30:
-            self.x_pos = 900
-        elif self.x_pos > 900:
-            self.x_pos - 30
-        return self.x_pos, self.y_pos, self.direction
-
-    def move_pinky(self):
-        # r, l, u, d
-        # inky is going to turn left or right whenever advantageous, but only up or down on collision
-        if self.direction == 0:
-            if self.target[0] > self.x_pos and self.turns[0]:
-                self.x_pos += self.speed
-            elif not self.turns[0]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-            elif self.turns[0]:
-                self.x_pos += self.speed
-        elif self.direction == 1:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.direction = 3
-            elif self.target[0] < self.x_pos and self.turns[1]:
-                self.x_pos -= self.speed
-            elif not self.turns[1]:
-                if self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[1]:
-                self.x_pos -= self.speed
-        elif self.direction == 2:
-            if self.target[0] < self.x_pos and self.turns[1]:
-                self.direction = 1
-                self.x_pos -= self.speed
-            elif self.target[1] < self.y_pos and self.turns[2]:
-                self.direction = 2
-                self.y_pos -= self.speed
-            elif not self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] > self.y_pos and self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[3]:
-                    self.direction = 3
-                    self.y_pos += self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[2]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                else:
-                    self.y_pos -= self.speed
-        elif self.direction == 3:
-            if self.target[1] > self.y_pos and self.turns[3]:
-                self.y_pos += self.speed
-            elif not self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.target[1] < self.y_pos and self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[2]:
-                    self.direction = 2
-                    self.y_pos -= self.speed
-                elif self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                elif self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-            elif self.turns[3]:
-                if self.target[0] > self.x_pos and self.turns[0]:
-                    self.direction = 0
-                    self.x_pos += self.speed
-                elif self.target[0] < self.x_pos and self.turns[1]:
-                    self.direction = 1
-                    self.x_pos -= self.speed
-                else:
-                    self.y_pos += self.speed
-        if self.x_pos < -30:
-            self.x_pos = 900
-        elif self.x_pos > 900:
-            self.x_pos - 30
-        return self.x_pos, self.y_pos, self.direction
-
-
-def draw_misc():
-    # Cyberpunk HUD with gradient background (50px height to match board offset)
-    # Create gradient background for HUD
-    for y in range(50):
-        alpha = int(255 - (y * 2.5))
-        color_r = int(10 + (y * 0.6))
-        color_g = int(10 + (y * 0.4))
-        color_b = int(30 + (y * 1.0))
-        pygame.draw.line(screen, (color_r, color_g, color_b), (0, y), (WIDTH, y), 1)
-    
-    # Top border with gradient
-    pygame.draw.line(screen, (252, 238, 10), (0, 48), (WIDTH, 48), 2) # Cyber Yellow
-    pygame.draw.line(screen, (0, 240, 255), (0, 50), (WIDTH, 50), 2) # Cyber Blue
-    
-    # Game Title (Left)
-    title_font = pygame.font.Font('freesansbold.ttf', 20)
-    title_text = title_font.render('PACMAN', True, (252, 238, 10)) # Cyber Yellow
-    edition_text = pygame.font.Font('freesansbold.ttf', 10).render('CLASSIC EDITION', True, (0, 240, 255))
-    screen.blit(title_text, (12, 6))
-    screen.blit(edition_text, (12, 30))
-    
-    # Score (Left-Center)
-    score_label = pygame.font.Font('freesansbold.ttf', 12).render('SCORE', True, (150, 150, 150))
-    score_value = pygame.font.Font('freesansbold.ttf', 18).render(str(score), True, (252, 238, 10))
-    screen.blit(score_label, (160, 8))
-    screen.blit(score_value, (160, 24))
-    
-    # Lives (Center) - Moved from right to avoid pause button clash
-    lives_label = pygame.font.Font('freesansbold.ttf', 12).render('LIVES', True, (150, 150, 150))
-    screen.blit(lives_label, (WIDTH // 2 - 35, 8))
-    for i in range(lives):
-        screen.blit(pygame.transform.scale(player_images[0], (24, 24)), (WIDTH // 2 - 42 + i * 30, 24))
-    
-    # Level (Right-Center)
-    try:
-        level_label = pygame.font.Font('freesansbold.ttf', 12).render('LEVEL', True, (150, 150, 150))
-        level_value = pygame.font.Font('freesansbold.ttf', 18).render(str(current_level_display), True, (0, 240, 255))
-        screen.blit(level_label, (WIDTH - 160, 8))
-        screen.blit(level_value, (WIDTH - 160, 24))
-    except NameError:
-        pass
-    
-    # Decorative corner accents
-    pygame.draw.line(screen, (255, 0, 60), (0, 0), (25, 0), 2)
-    pygame.draw.line(screen, (255, 0, 60), (0, 0), (0, 25), 2)
-    pygame.draw.line(screen, (0, 240, 255), (WIDTH - 25, 0), (WIDTH, 0), 2)
-    pygame.draw.line(screen, (0, 240, 255), (WIDTH, 0), (WIDTH, 25), 2)
-        
-        
-    # Game Over / Victory Screens
-    if game_over:
-        # Semi-transparent overlay
-        s = pygame.Surface((WIDTH, HEIGHT))
-        s.set_alpha(220)
-        s.fill((5, 5, 10))
-        screen.blit(s, (0, 0))
-        
-        # Game Over Box - Cyber Style
-        box_rect = pygame.Rect(200, 300, 500, 200)
-        pygame.draw.rect(screen, (0, 0, 0), box_rect)
-        pygame.draw.rect(screen, (255, 0, 60), box_rect, 4) # Pink Border
-        
-        # Corner accents
-        pygame.draw.line(screen, (255, 0, 60), (box_rect.left, box_rect.top), (box_rect.left + 40, box_rect.top), 8)
-        pygame.draw.line(screen, (255, 0, 60), (box_rect.left, box_rect.top), (box_rect.left, box_rect.top + 40), 8)
-        pygame.draw.line(screen, (255, 0, 60), (box_rect.right - 40, box_rect.bottom), (box_rect.right, box_rect.bottom), 8)
-        pygame.draw.line(screen, (255, 0, 60), (box_rect.right, box_rect.bottom - 40), (box_rect.right, box_rect.bottom), 8)
-        
-        gameover_text = gameover_font.render('GAME OVER', True, (255, 0, 60))
-        restart_text = font.render('Press Space to Restart', True, (255, 255, 255))
-        
-        screen.blit(gameover_text, (WIDTH//2 - gameover_text.get_width()//2, 350))
-        screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, 420))
-        
-    if game_won:
-        # Semi-transparent overlay
-        s = pygame.Surface((WIDTH, HEIGHT))
-        s.set_alpha(220)
-        s.fill((5, 5, 10))
-        screen.blit(s, (0, 0))
-        
-        # Victory Box - Cyber Style
-        box_rect = pygame.Rect(200, 300, 500, 200)
-        pygame.draw.rect(screen, (0, 0, 0), box_rect)
-        pygame.draw.rect(screen, (0, 240, 255), box_rect, 4) # Blue Border
-        
-        # Corner accents
-        pygame.draw.line(screen, (0, 240, 255), (box_rect.left, box_rect.top), (box_rect.left + 40, box_rect.top), 8)
-        pygame.draw.line(screen, (0, 240, 255), (box_rect.left, box_rect.top), (box_rect.left, box_rect.top + 40), 8)
-        pygame.draw.line(screen, (0, 240, 255), (box_rect.right - 40, box_rect.bottom), (box_rect.right, box_rect.bottom), 8)
-        pygame.draw.line(screen, (0, 240, 255), (box_rect.right, box_rect.bottom - 40), (box_rect.right, box_rect.bottom), 8)
-        
-        victory_text = gameover_font.render('VICTORY!', True, (0, 240, 255))
-        restart_text = font.render('Press Space to Advance', True, (255, 255, 255))
-        
-        screen.blit(victory_text, (WIDTH//2 - victory_text.get_width()//2, 350))
-        screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, 420))
-
-
-def check_collisions(scor, power, power_count, eaten_ghosts, center_x, center_y):
-    num1 = (HEIGHT - 50) // 32
-    num2 = WIDTH // 30
-    if 0 < player_x < 870:
-        if level[int(center_y // num1)][int(center_x // num2)] == 1:
-            level[int(center_y // num1)][int(center_x // num2)] = 0
-            scor += 10
-        if level[int(center_y // num1)][int(center_x // num2)] == 2:
-            level[int(center_y // num1)][int(center_x // num2)] = 0
-            scor += 50
-            power = True
-            power_count = 0
-            eaten_ghosts = [False, False, False, False]
-    return scor, power, power_count, eaten_ghosts
-
-
-def draw_board():
-    num1 = ((HEIGHT - 50) // 32)
-    num2 = (WIDTH // 30)
-    for i in range(len(level)):
-        for j in range(len(level[i])):
-            if level[i][j] == 1:
-                pygame.draw.circle(screen, 'white', (int(j * num2 + (0.5 * num2)), int(i * num1 + (0.5 * num1))), 4)
-            if level[i][j] == 2 and not flicker:
-                pygame.draw.circle(screen, 'white', (int(j * num2 + (0.5 * num2)), int(i * num1 + (0.5 * num1))), 10)
-            if level[i][j] == 3:
-                pygame.draw.line(screen, color, (int(j * num2 + (0.5 * num2)), int(i * num1)),
-                                 (int(j * num2 + (0.5 * num2)), int(i * num1 + num1)), 3)
-            if level[i][j] == 4:
-                pygame.draw.line(screen, color, (int(j * num2), int(i * num1 + (0.5 * num1))),
-                                 (int(j * num2 + num2), int(i * num1 + (0.5 * num1))), 3)
-            if level[i][j] == 5:
-                pygame.draw.arc(screen, color, [int(j * num2 - (num2 * 0.4) - 2), int(i * num1 + (0.5 * num1)), int(num2), int(num1)],
-                                0, PI / 2, 3)
-            if level[i][j] == 6:
-                pygame.draw.arc(screen, color,
-                                [int(j * num2 + (num2 * 0.5)), int(i * num1 + (0.5 * num1)), int(num2), int(num1)], PI / 2, PI, 3)
-            if level[i][j] == 7:
-                pygame.draw.arc(screen, color, [int(j * num2 + (num2 * 0.5)), int(i * num1 - (0.4 * num1)), int(num2), int(num1)], PI,
-                                3 * PI / 2, 3)
-            if level[i][j] == 8:
-                pygame.draw.arc(screen, color,
-                                [int(j * num2 - (num2 * 0.4) - 2), int(i * num1 - (0.4 * num1)), int(num2), int(num1)], 3 * PI / 2,
-                                2 * PI, 3)
-            if level[i][j] == 9:
-                pygame.draw.line(screen, 'white', (int(j * num2), int(i * num1 + (0.5 * num1))),
-                                 (int(j * num2 + num2), int(i * num1 + (0.5 * num1))), 3)
-
-
-def draw_player():
-    # 0-RIGHT, 1-LEFT, 2-UP, 3-DOWN
-    if direction == 0:
-        screen.blit(player_images[counter // 5], (player_x, player_y))
-    elif direction == 1:
-        screen.blit(pygame.transform.flip(player_images[counter // 5], True, False), (player_x, player_y))
-    elif direction == 2:
-        screen.blit(pygame.transform.rotate(player_images[counter // 5], 90), (player_x, player_y))
-    elif direction == 3:
-        screen.blit(pygame.transform.rotate(player_images[counter // 5], 270), (player_x, player_y))
-
-
-def check_position(centerx, centery):
-    turns = [False, False, False, False]
-    num1 = (HEIGHT - 50) // 32
-    num2 = (WIDTH // 30)
-    num3 = 15
-    # check collisions based on center x and center y of player +/- fudge number
-    if centerx // 30 < 29:
-        if direction == 0:
-            if level[int(centery // num1)][int((centerx - num3) // num2)] < 3:
-                turns[1] = True
-        if direction == 1:
-            if level[int(centery // num1)][int((centerx + num3) // num2)] < 3:
-                turns[0] = True
-        if direction == 2:
-            if level[int((centery + num3) // num1)][int(centerx // num2)] < 3:
-                turns[3] = True
-        if direction == 3:
-            if level[int((centery - num3) // num1)][int(centerx // num2)] < 3:
-                turns[2] = True
-
-        if direction == 2 or direction == 3:
-            if 10 <= centerx % num2 <= 20:
-                if level[int((centery + num3) // num1)][int(centerx // num2)] < 3:
-                    turns[3] = True
-                if level[int((centery - num3) // num1)][int(centerx // num2)] < 3:
-                    turns[2] = True
-            if 10 <= centery % num1 <= 20:
-                if level[int(centery // num1)][int((centerx - num2) // num2)] < 3:
-                    turns[1] = True
-                if level[int(centery // num1)][int((centerx + num2) // num2)] < 3:
-                    turns[0] = True
-        if direction == 0 or direction == 1:
-            if 10 <= centerx % num2 <= 20:
-                if level[int((centery + num3) // num1)][int(centerx // num2)] < 3:
-                    turns[3] = True
-                if level[int((centery - num3) // num1)][int(centerx // num2)] < 3:
-                    turns[2] = True
-            if 10 <= centery % num1 <= 20:
-                if level[int(centery // num1)][int((centerx - num3) // num2)] < 3:
-                    turns[1] = True
-                if level[int(centery // num1)][int((centerx + num3) // num2)] < 3:
-                    turns[0] = True
-    else:
-        turns[0] = True
-        turns[1] = True
-
-    return turns
-
-
-def move_player(play_x, play_y):
-    # r, l, u, d
-    if direction == 0 and turns_allowed[0]:
-        play_x += player_speed
-    elif direction == 1 and turns_allowed[1]:
-        play_x -= player_speed
-    if direction == 2 and turns_allowed[2]:
-        play_y -= player_speed
-    elif direction == 3 and turns_allowed[3]:
-        play_y += player_speed
-    return play_x, play_y
-
-
-def get_targets(blink_x, blink_y, ink_x, ink_y, pink_x, pink_y, clyd_x, clyd_y):
-    if player_x < 450:
-        runaway_x = 900
-    else:
-        runaway_x = 0
-    if player_y < 450:
-        runaway_y = 900
-    else:
-        runaway_y = 0
-    return_target = (380, 400)
-    if powerup:
-        if not blinky.dead and not eaten_ghost[0]:
-            blink_target = (runaway_x, runaway_y)
-        elif not blinky.dead and eaten_ghost[0]:
-            if 340 < blink_x < 560 and 340 < blink_y < 500:
-                blink_target = (400, 100)
-            else:
-                blink_target = (player_x, player_y)
-        else:
-            blink_target = return_target
-        if not inky.dead and not eaten_ghost[1]:
-            ink_target = (runaway_x, player_y)
-        elif not inky.dead and eaten_ghost[1]:
-            if 340 < ink_x < 560 and 340 < ink_y < 500:
-                ink_target = (400, 100)
-            else:
-                ink_target = (player_x, player_y)
-        else:
-            ink_target = return_target
-        if not pinky.dead:
-            pink_target = (player_x, runaway_y)
-        elif not pinky.dead and eaten_ghost[2]:
-            if 340 < pink_x < 560 and 340 < pink_y < 500:
-                pink_target = (400, 100)
-            else:
-                pink_target = (player_x, player_y)
-        else:
-            pink_target = return_target
-        if not clyde.dead and not eaten_ghost[3]:
-            clyd_target = (450, 450)
-        elif not clyde.dead and eaten_ghost[3]:
-            if 340 < clyd_x < 560 and 340 < clyd_y < 500:
-                clyd_target = (400, 100)
-            else:
-                clyd_target = (player_x, player_y)
-        else:
-            clyd_target = return_target
-    else:
-        if not blinky.dead:
-            if 340 < blink_x < 560 and 340 < blink_y < 500:
-                blink_target = (400, 100)
-            else:
-                blink_target = (player_x, player_y)
-        else:
-            blink_target = return_target
-        if not inky.dead:
-            if 340 < ink_x < 560 and 340 < ink_y < 500:
-                ink_target = (400, 100)
-            else:
-                ink_target = (player_x, player_y)
-        else:
-            ink_target = return_target
-        if not pinky.dead:
-            if 340 < pink_x < 560 and 340 < pink_y < 500:
-                pink_target = (400, 100)
-            else:
-                pink_target = (player_x, player_y)
-        else:
-            pink_target = return_target
-        if not clyde.dead:
-            if 340 < clyd_x < 560 and 340 < clyd_y < 500:
-                clyd_target = (400, 100)
-            else:
-                clyd_target = (player_x, player_y)
-        else:
-            clyd_target = return_target
-    return [blink_target, ink_target, pink_target, clyd_target]
-
-
-def randomize_bonuses(level_grid):
-    # Find all positions of small dots (1) and power pellets (2)
-    small_dots = []
-    power_pellets = []
-    
-    for r in range(len(level_grid)):
-        for c in range(len(level_grid[r])):
-            if level_grid[r][c] == 1:
-                small_dots.append((r, c))
-            elif level_grid[r][c] == 2:
-                power_pellets.append((r, c))
-    
-    # Randomly swap power pellets with small dots
-    # We want to keep the number of power pellets constant, just move them
-    # But we can also just pick random positions from the combined list of valid spots
-    
-    # Let's just shuffle the power pellets into new positions from the available dot spots
-    # First, turn existing power pellets into small dots
-    for r, c in power_pellets:
-        level_grid[r][c] = 1
-        small_dots.append((r, c))
-        
-    # Now pick random spots for power pellets
-    # Now pick random spots for power pellets with minimum distance
-    if small_dots:
-        chosen_spots = []
-        min_distance = 10  # Minimum tile distance between power pellets
-        
-        for _ in range(len(power_pellets)):
-            # Try to find a spot that is far enough from existing chosen spots
-            valid_spot = None
-            random.shuffle(small_dots)
-            
-            for spot in small_dots:
-                if spot in chosen_spots:
-                    continue
-                    
-                # Check distance to all currently chosen spots
-                too_close = False
-                for existing in chosen_spots:
-                    dist = math.sqrt((spot[0] - existing[0])**2 + (spot[1] - existing[1])**2)
-                    if dist < min_distance:
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    valid_spot = spot
-                    break
-            
-            # If we couldn't find a spot far enough (e.g. map too small), just pick a random available one
-            if valid_spot is None:
-                remaining = [s for s in small_dots if s not in chosen_spots]
-                if remaining:
-                    valid_spot = random.choice(remaining)
-            
-            if valid_spot:
-                chosen_spots.append(valid_spot)
-                level_grid[valid_spot[0]][valid_spot[1]] = 2
-
-
-def play_level(speed_mult=1.0, extra_ghosts=0, board_index=0, level_num=1):
-    global counter, flicker, power_counter, powerup, eaten_ghost, startup_counter, moving, \
-           player_x, player_y, direction, direction_command, blinky_x, blinky_y, blinky_direction, \
-           inky_x, inky_y, inky_direction, pinky_x, pinky_y, pinky_direction, clyde_x, clyde_y, clyde_direction, \
-           blinky_dead, inky_dead, clyde_dead, pinky_dead, score, lives, game_over, game_won, level, targets, \
-           turns_allowed, blinky, inky, pinky, clyde, ghost_speeds, current_level_display
-
-    current_level_display = level_num
-
-    # Load the appropriate board
-    if board_index < len(all_boards):
-        level = copy.deepcopy(all_boards[board_index])
-    else:
-        level = copy.deepcopy(all_boards[board_index % len(all_boards)])
-        
-    # Randomize bonus positions
-    randomize_bonuses(level)
-
-    paused = False
-    pause_font = pygame.font.Font('freesansbold.ttf', 20)
-    pause_rect = pygame.Rect(WIDTH - 100, 10, 80, 30)
-
-    run = True
-    while run:
-        timer.tick(fps)
-        if counter < 19:
-            counter += 1
-            if counter > 3:
-                flicker = False
-        else:
-            counter = 0
-            flicker = True
-        if powerup and power_counter < 600:
-            power_counter += 1
-        elif powerup and power_counter >= 600:
-            power_counter = 0
-            powerup = False
-            eaten_ghost = [False, False, False, False]
-        if startup_counter < 180 and not game_over and not game_won:
-            moving = False
-            startup_counter += 1
-        elif game_over or game_won:
-            moving = False
-        else:
-            moving = True
-
-        screen.fill('black')
-        draw_board()
-        center_x = player_x + 23
-        center_y = player_y + 24
-        
-        # Adjust speeds based on level multiplier
-        base_speed = 2 * speed_mult
-        
-        if powerup:
-            ghost_speeds = [1 * speed_mult, 1 * speed_mult, 1 * speed_mult, 1 * speed_mult]
-        else:
-            ghost_speeds = [base_speed, base_speed, base_speed, base_speed]
-        
-        if eaten_ghost[0]:
-            ghost_speeds[0] = base_speed
-        if eaten_ghost[1]:
-            ghost_speeds[1] = base_speed
-        if eaten_ghost[2]:
-            ghost_speeds[2] = base_speed
-        if eaten_ghost[3]:
-            ghost_speeds[3] = base_speed
-        if blinky_dead:
-            ghost_speeds[0] = 4 * speed_mult
-        if inky_dead:
-            ghost_speeds[1] = 4 * speed_mult
-        if pinky_dead:
-            ghost_speeds[2] = 4 * speed_mult
-        if clyde_dead:
-            ghost_speeds[3] = 4 * speed_mult
-
-        player_circle = pygame.draw.circle(screen, 'black', (center_x, center_y), 20, 2)
-        draw_player()
-        blinky = Ghost(blinky_x, blinky_y, targets[0], ghost_speeds[0], blinky_img, blinky_direction, blinky_dead, blinky_box, 0)
-        inky = Ghost(inky_x, inky_y, targets[1], ghost_speeds[1], inky_img, inky_direction, inky_dead, inky_box, 1)
-        pinky = Ghost(pinky_x, pinky_y, targets[2], ghost_speeds[2], pinky_img, pinky_direction, pinky_dead, pinky_box, 2)
-        clyde = Ghost(clyde_x, clyde_y, targets[3], ghost_speeds[3], clyde_img, clyde_direction, clyde_dead, clyde_box, 3)
-        draw_misc()
-        
-        # Draw Pause Button (Top Right, non-colliding)
-        pygame.draw.rect(screen, (50, 50, 70), pause_rect, border_radius=5)
-        pygame.draw.rect(screen, (100, 100, 150), pause_rect, 2, border_radius=5)
-        pause_text = pause_font.render("PAUSE", True, 'white')
-        text_rect = pause_text.get_rect(center=pause_rect.center)
-        screen.blit(pause_text, text_rect)
-
-        if paused:
-            # Draw Pause Overlay (Pac-Man 256 Style)
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 50, 200)) # Dark blue transparent background
-            screen.blit(overlay, (0, 0))
-            
-            # PAUSED Title
-            big_font = pygame.font.Font('freesansbold.ttf', 80)
-            paused_text = big_font.render("PAUSED", True, 'white')
-            paused_rect = paused_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 150))
-            screen.blit(paused_text, paused_rect)
-            
-            # Buttons Style
-            btn_width = 250
-            btn_height = 50
-            spacing = 20
-            start_y = HEIGHT // 2 - 60
-            
-            resume_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y, btn_width, btn_height)
-            restart_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + btn_height + spacing, btn_width, btn_height)
-            menu_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + (btn_height + spacing) * 2, btn_width, btn_height)
-            quit_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + (btn_height + spacing) * 3, btn_width, btn_height)
-            
-            mouse_pos = pygame.mouse.get_pos()
-            
-            # Helper to draw cyber button
-            def draw_cyber_btn(rect, text, hover):
-                color = (252, 238, 10) if hover else (20, 20, 30) # Cyber Yellow / Dark
-                border_color = (255, 255, 255) if hover else (0, 240, 255) # White / Cyber Blue
-                text_color = (0, 0, 0) if hover else (0, 240, 255) # Black / Cyber Blue
-                
-                # Chamfered corners
-                cut = 10
-                x, y, w, h = rect.x, rect.y, rect.width, rect.height
-                points = [
-                    (x + cut, y), (x + w, y), (x + w, y + h - cut),
-                    (x + w - cut, y + h), (x, y + h), (x, y + cut)
-                ]
-                
-                pygame.draw.polygon(screen, color, points)
-                pygame.draw.polygon(screen, border_color, points, 2)
-                
-                txt_surf = font.render(text, True, text_color)
-                txt_rect = txt_surf.get_rect(center=rect.center)
-                screen.blit(txt_surf, txt_rect)
-
-            draw_cyber_btn(resume_rect, "RESUME", resume_rect.collidepoint(mouse_pos))
-            draw_cyber_btn(restart_rect, "RESTART", restart_rect.collidepoint(mouse_pos))
-            draw_cyber_btn(menu_rect, "MENU", menu_rect.collidepoint(mouse_pos))
-            draw_cyber_btn(quit_rect, "QUIT", quit_rect.collidepoint(mouse_pos))
-            
-            pygame.display.flip()
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return "QUIT"
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE:
-                        paused = not paused
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if pause_rect.collidepoint(event.pos):
-                        paused = not paused
-                    elif resume_rect.collidepoint(event.pos):
-                        paused = False
-                    elif restart_rect.collidepoint(event.pos):
-                        return "RESTART"
-                    elif menu_rect.collidepoint(event.pos):
-                        return "MENU"
-                    elif quit_rect.collidepoint(event.pos):
-                        return "QUIT"
-            continue
-
-
-
-
-        game_won = True
-        for i in range(len(level)):
-            if 1 in level[i] or 2 in level[i]:
-                game_won = False
-                break  # Exit early once we know there are dots left
-        
-        if game_won:
-            # Let the loop continue to show victory screen
-            pass
-
-        targets = get_targets(blinky_x, blinky_y, inky_x, inky_y, pinky_x, pinky_y, clyde_x, clyde_y)
-
-        turns_allowed = check_position(center_x, center_y)
-        # Stop movement if game is over or won
-        if moving and not game_over and not game_won:
-            player_x, player_y = move_player(player_x, player_y)
-            if not blinky_dead and not blinky.in_box:
-                blinky_x, blinky_y, blinky_direction = blinky.move_blinky()
-            else:
-                blinky_x, blinky_y, blinky_direction = blinky.move_clyde()
-            if not pinky_dead and not pinky.in_box:
-                pinky_x, pinky_y, pinky_direction = pinky.move_pinky()
-            else:
-                pinky_x, pinky_y, pinky_direction = pinky.move_clyde()
-            if not inky_dead and not inky.in_box:
-                inky_x, inky_y, inky_direction = inky.move_inky()
-            else:
-                inky_x, inky_y, inky_direction = inky.move_clyde()
-            clyde_x, clyde_y, clyde_direction = clyde.move_clyde()
-        score, powerup, power_counter, eaten_ghost = check_collisions(score, powerup, power_counter, eaten_ghost, center_x, center_y)
-        # add to if not powerup to check if eaten ghosts
-        if not powerup:
-            if (player_circle.colliderect(blinky.rect) and not blinky.dead) or \
-                    (player_circle.colliderect(inky.rect) and not inky.dead) or \
-                    (player_circle.colliderect(pinky.rect) and not pinky.dead) or \
-                    (player_circle.colliderect(clyde.rect) and not clyde.dead):
-                if lives > 0:
-                    lives -= 1
-                    startup_counter = 0
-                    powerup = False
-                    power_counter = 0
-                    player_x = 450
-                    player_y = 663
-                    direction = 0
-                    direction_command = 0
-                    blinky_x = 56
-                    blinky_y = 58
-                    blinky_direction = 0
-                    inky_x = 440
-                    inky_y = 388
-                    inky_direction = 2
-                    pinky_x = 440
-                    pinky_y = 438
-                    pinky_direction = 2
-                    clyde_x = 440
-                    clyde_y = 438
-                    clyde_direction = 2
-                    eaten_ghost = [False, False, False, False]
-                    blinky_dead = False
-                    inky_dead = False
-                    clyde_dead = False
-                    pinky_dead = False
-                else:
-                    game_over = True
-                    moving = False
-                    startup_counter = 0
-        if powerup and player_circle.colliderect(blinky.rect) and eaten_ghost[0] and not blinky.dead:
-            if lives > 0:
-                powerup = False
-                power_counter = 0
-                lives -= 1
-                startup_counter = 0
-                player_x = 450
-                player_y = 663
-                direction = 0
-                direction_command = 0
-                blinky_x = 56
-                blinky_y = 58
-                blinky_direction = 0
-                inky_x = 440
-                inky_y = 388
-                inky_direction = 2
-                pinky_x = 440
-                pinky_y = 438
-                pinky_direction = 2
-                clyde_x = 440
-                clyde_y = 438
-                clyde_direction = 2
-                eaten_ghost = [False, False, False, False]
-                blinky_dead = False
-                inky_dead = False
-                clyde_dead = False
-                pinky_dead = False
-            else:
-                game_over = True
-                moving = False
-                startup_counter = 0
-        if powerup and player_circle.colliderect(inky.rect) and eaten_ghost[1] and not inky.dead:
-            if lives > 0:
-                powerup = False
-                power_counter = 0
-                lives -= 1
-                startup_counter = 0
-                player_x = 450
-                player_y = 663
-                direction = 0
-                direction_command = 0
-                blinky_x = 56
-                blinky_y = 58
-                blinky_direction = 0
-                inky_x = 440
-                inky_y = 388
-                inky_direction = 2
-                pinky_x = 440
-                pinky_y = 438
-                pinky_direction = 2
-                clyde_x = 440
-                clyde_y = 438
-                clyde_direction = 2
-                eaten_ghost = [False, False, False, False]
-                blinky_dead = False
-                inky_dead = False
-                clyde_dead = False
-                pinky_dead = False
-            else:
-                game_over = True
-                moving = False
-                startup_counter = 0
-        if powerup and player_circle.colliderect(pinky.rect) and eaten_ghost[2] and not pinky.dead:
-            if lives > 0:
-                powerup = False
-                power_counter = 0
-                lives -= 1
-                startup_counter = 0
-                player_x = 450
-                player_y = 663
-                direction = 0
-                direction_command = 0
-                blinky_x = 56
-                blinky_y = 58
-                blinky_direction = 0
-                inky_x = 440
-                inky_y = 388
-                inky_direction = 2
-                pinky_x = 440
-                pinky_y = 438
-                pinky_direction = 2
-                clyde_x = 440
-                clyde_y = 438
-                clyde_direction = 2
-                eaten_ghost = [False, False, False, False]
-                blinky_dead = False
-                inky_dead = False
-                clyde_dead = False
-                pinky_dead = False
-            else:
-                game_over = True
-                moving = False
-                startup_counter = 0
-        if powerup and player_circle.colliderect(clyde.rect) and eaten_ghost[3] and not clyde.dead:
-            if lives > 0:
-                powerup = False
-                power_counter = 0
-                lives -= 1
-                startup_counter = 0
-                player_x = 450
-                player_y = 663
-                direction = 0
-                direction_command = 0
-                blinky_x = 56
-                blinky_y = 58
-                blinky_direction = 0
-                inky_x = 440
-                inky_y = 388
-                inky_direction = 2
-                pinky_x = 440
-                pinky_y = 438
-                pinky_direction = 2
-                clyde_x = 440
-                clyde_y = 438
-                clyde_direction = 2
-                eaten_ghost = [False, False, False, False]
-                blinky_dead = False
-                inky_dead = False
-                clyde_dead = False
-                pinky_dead = False
-            else:
-                game_over = True
-                moving = False
-                startup_counter = 0
-        if powerup and player_circle.colliderect(blinky.rect) and not blinky.dead and not eaten_ghost[0]:
-            blinky_dead = True
-            eaten_ghost[0] = True
-            score += (2 ** eaten_ghost.count(True)) * 100
-        if powerup and player_circle.colliderect(inky.rect) and not inky.dead and not eaten_ghost[1]:
-            inky_dead = True
-            eaten_ghost[1] = True
-            score += (2 ** eaten_ghost.count(True)) * 100
-        if powerup and player_circle.colliderect(pinky.rect) and not pinky.dead and not eaten_ghost[2]:
-            pinky_dead = True
-            eaten_ghost[2] = True
-            score += (2 ** eaten_ghost.count(True)) * 100
-        if powerup and player_circle.colliderect(clyde.rect) and not clyde.dead and not eaten_ghost[3]:
-            clyde_dead = True
-            eaten_ghost[3] = True
-            score += (2 ** eaten_ghost.count(True)) * 100
-
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "QUIT"
-            if event.type == pygame.KEYDOWN:
-                if not game_over and not game_won:
-                    if event.key == pygame.K_RIGHT:
-                        direction_command = 0
-                    if event.key == pygame.K_LEFT:
-                        direction_command = 1
-                    if event.key == pygame.K_UP:
-                        direction_command = 2
-                    if event.key == pygame.K_DOWN:
-                        direction_command = 3
-                if event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE:
-                    if game_over:
-                        if event.key == pygame.K_SPACE:
-                            return "GAMEOVER"
-                        else:
-                            return "QUIT"
-                    elif game_won:
-                        if event.key == pygame.K_SPACE:
-                            return "VICTORY"
-                        else:
-                            return "QUIT"
-                    # Toggle pause if game is running normally
-                    elif not game_over and not game_won:
-                        paused = not paused
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Check if pause button was clicked
-                if pause_rect.collidepoint(event.pos):
-                    paused = not paused
-
-            if event.type == pygame.KEYUP:
-                if event.key == pygame.K_RIGHT and direction_command == 0:
-                    direction_command = direction
-                if event.key == pygame.K_LEFT and direction_command == 1:
-                    direction_command = direction
-                if event.key == pygame.K_UP and direction_command == 2:
-                    direction_command = direction
-                if event.key == pygame.K_DOWN and direction_command == 3:
-                    direction_command = direction
-
-
-        if direction_command == 0 and turns_allowed[0]:
-            direction = 0
-        if direction_command == 1 and turns_allowed[1]:
-            direction = 1
-        if direction_command == 2 and turns_allowed[2]:
-            direction = 2
-        if direction_command == 3 and turns_allowed[3]:
-            direction = 3
-
-        if player_x > 900:
-            player_x = -47
-        elif player_x < -50:
-            player_x = 897
-
-        if blinky.in_box and blinky_dead:
-            blinky_dead = False
-        if inky.in_box and inky_dead:
-            inky_dead = False
-        if pinky.in_box and pinky_dead:
-            pinky_dead = False
-        if clyde.in_box and clyde_dead:
-            clyde_dead = False
-
-        pygame.display.flip()
-
-if __name__ == "__main__":
-    init_globals()
-    play_level()
-    pygame.quit()
-
-
-# sound effects, restart and winning messages
+# Build Pac-Man from Scratch in Python with PyGame!!
+from replay import InputLog
+import assets
+import pygame
+import random
+import math
+import os
+
+WIDTH = 900
+HEIGHT = 950
+# the window and sprites are set up by init_display() the first time something is drawn
+screen = None
+timer = pygame.time.Clock()
+# display frame cap, 120/144 (or 0 for no cap) only makes the drawing smoother
+fps = 60
+# the rules always advance at TICK_RATE ticks per second, however fast frames are drawn
+TICK_RATE = 60
+TICK_MS = 1000 / TICK_RATE
+# longer frames (window dragged, machine stalled) are cut to this so the game does not race to catch up
+MAX_FRAME_MS = 250
+# draw sprites between the last two ticks; moves longer than SNAP_DISTANCE (tunnel, respawn) jump
+INTERPOLATE = True
+SNAP_DISTANCE = 30
+# Redraw only changed regions and push them with display.update(rects), for software-rendered displays
+DIRTY_RECTS = False
+# with more sprites than this (swarm mode) repainting the whole screen is cheaper than the rect list
+MAX_DIRTY_SPRITES = 150
+# When set, every played level's input log is saved in this folder (see replay.py)
+REPLAY_DIR = None
+render_text = assets.render_text
+
+
+color = 'blue'
+PI = math.pi
+# every animation frame pre-turned for each direction: player_sprites[frame][direction]
+# 0-RIGHT, 1-LEFT, 2-UP, 3-DOWN
+player_sprites = []
+# ghost looks by kind (blinky, inky, pinky, clyde): (normal, spooked, dead)
+ghost_sprites = []
+life_img = None
+# pre-rendered maze walls keyed by (board index, color)
+wall_surfaces = {}
+# HUD background and overlay surfaces, built on first use
+overlays = {}
+
+
+def init_display():
+    # Opens the window and loads the sprites, only the first call does any work
+    global screen, life_img
+    if screen is not None:
+        return screen
+    screen = assets.get_screen()
+    player_images = [assets.get_image(f'assets/player_images/{i}.png', (45, 45)) for i in range(1, 5)]
+    for image in player_images:
+        player_sprites.append([image,
+                               pygame.transform.flip(image, True, False),
+                               pygame.transform.rotate(image, 90),
+                               pygame.transform.rotate(image, 270)])
+    spooked_img = assets.get_image('assets/ghost_images/powerup.png', (45, 45))
+    dead_img = assets.get_image('assets/ghost_images/dead.png', (45, 45))
+    # indexed by ghost kind: blinky, inky, pinky, clyde
+    for name in ('red', 'blue', 'pink', 'orange'):
+        ghost_sprites.append((assets.get_image(f'assets/ghost_images/{name}.png', (45, 45)), spooked_img, dead_img))
+    life_img = pygame.transform.scale(player_images[0], (24, 24))
+    return screen
+
+class GameState:
+    # One player's run, passed to play_level. Score, lives and the level number carry over
+    # between levels; sim is the Simulation of the level being played (player, ghosts, grid, timers)
+    # and replay its InputLog.
+    __slots__ = ('score', 'lives', 'level', 'sim', 'replay')
+
+    def __init__(self, score=0, lives=3, level=1):
+        self.score = score
+        self.lives = lives
+        self.level = level
+        self.sim = None
+        self.replay = None
+
+
+def get_hud_background():
+    # Gradient, borders, static labels and corner accents never change, so they are drawn once
+    if 'hud' not in overlays:
+        hud = pygame.Surface((WIDTH, 52), pygame.SRCALPHA)
+        for y in range(50):
+            color_r = int(10 + (y * 0.6))
+            color_g = int(10 + (y * 0.4))
+            color_b = int(30 + (y * 1.0))
+            pygame.draw.line(hud, (color_r, color_g, color_b), (0, y), (WIDTH, y), 1)
+
+        # Top border with gradient
+        pygame.draw.line(hud, (252, 238, 10), (0, 48), (WIDTH, 48), 2) # Cyber Yellow
+        pygame.draw.line(hud, (0, 240, 255), (0, 50), (WIDTH, 50), 2) # Cyber Blue
+
+        # Game Title (Left) and value labels
+        hud.blit(render_text('PACMAN', 20, (252, 238, 10)), (12, 6))
+        hud.blit(render_text('CLASSIC EDITION', 10, (0, 240, 255)), (12, 30))
+        hud.blit(render_text('SCORE', 12, (150, 150, 150)), (160, 8))
+        hud.blit(render_text('LIVES', 12, (150, 150, 150)), (WIDTH // 2 - 35, 8))
+        hud.blit(render_text('LEVEL', 12, (150, 150, 150)), (WIDTH - 160, 8))
+
+        # Decorative corner accents
+        pygame.draw.line(hud, (255, 0, 60), (0, 0), (25, 0), 2)
+        pygame.draw.line(hud, (255, 0, 60), (0, 0), (0, 25), 2)
+        pygame.draw.line(hud, (0, 240, 255), (WIDTH - 25, 0), (WIDTH, 0), 2)
+        pygame.draw.line(hud, (0, 240, 255), (WIDTH, 0), (WIDTH, 25), 2)
+        overlays['hud'] = hud
+    return overlays['hud']
+
+
+def get_dim_overlay():
+    # Semi-transparent full screen shade behind the game over / victory boxes
+    if 'dim' not in overlays:
+        s = pygame.Surface((WIDTH, HEIGHT))
+        s.set_alpha(220)
+        s.fill((5, 5, 10))
+        overlays['dim'] = s
+    return overlays['dim']
+
+
+def get_pause_overlay():
+    if 'pause' not in overlays:
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 50, 200)) # Dark blue transparent background
+        overlays['pause'] = overlay
+    return overlays['pause']
+
+
+def get_end_box(won):
+    # Game Over / Victory box - Cyber Style, drawn around box_rect with room for the corner accents
+    key = 'victory' if won else 'game_over'
+    if key not in overlays:
+        box = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        box_rect = pygame.Rect(200, 300, 500, 200)
+        accent = (0, 240, 255) if won else (255, 0, 60) # Blue / Pink Border
+        pygame.draw.rect(box, (0, 0, 0), box_rect)
+        pygame.draw.rect(box, accent, box_rect, 4)
+
+        # Corner accents
+        pygame.draw.line(box, accent, (box_rect.left, box_rect.top), (box_rect.left + 40, box_rect.top), 8)
+        pygame.draw.line(box, accent, (box_rect.left, box_rect.top), (box_rect.left, box_rect.top + 40), 8)
+        pygame.draw.line(box, accent, (box_rect.right - 40, box_rect.bottom), (box_rect.right, box_rect.bottom), 8)
+        pygame.draw.line(box, accent, (box_rect.right, box_rect.bottom - 40), (box_rect.right, box_rect.bottom), 8)
+
+        if won:
+            title_text = render_text('VICTORY!', 40, (0, 240, 255))
+            restart_text = render_text('Press Space to Advance', 20, (255, 255, 255))
+        else:
+            title_text = render_text('GAME OVER', 40, (255, 0, 60))
+            restart_text = render_text('Press Space to Restart', 20, (255, 255, 255))
+        box.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 350))
+        box.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, 420))
+
+        # keep only the area that was drawn on
+        area = box.get_bounding_rect()
+        overlays[key] = (box.subsurface(area).copy(), area.topleft)
+    return overlays[key]
+
+
+def draw_misc(sim, level_num):
+    # Cyberpunk HUD with gradient background (50px height to match board offset)
+    screen.blit(get_hud_background(), (0, 0))
+
+    # Score (Left-Center)
+    score_value = render_text(str(sim.score), 18, (252, 238, 10))
+    screen.blit(score_value, (160, 24))
+    
+    # Lives (Center) - Moved from right to avoid pause button clash
+    for i in range(sim.lives):
+        screen.blit(life_img, (WIDTH // 2 - 42 + i * 30, 24))
+    
+    # Level (Right-Center)
+    level_value = render_text(str(level_num), 18, (0, 240, 255))
+    screen.blit(level_value, (WIDTH - 160, 24))
+
+    # Game Over / Victory Screens
+    if sim.game_over or sim.game_won:
+        screen.blit(get_dim_overlay(), (0, 0))
+        box, pos = get_end_box(sim.game_won)
+        screen.blit(box, pos)
+
+
+def draw_walls(surface, level):
+    num1 = ((HEIGHT - 50) // 32)
+    num2 = (WIDTH // 30)
+    for i in range(len(level)):
+        for j in range(len(level[i])):
+            if level[i][j] == 3:
+                pygame.draw.line(surface, color, (int(j * num2 + (0.5 * num2)), int(i * num1)),
+                                 (int(j * num2 + (0.5 * num2)), int(i * num1 + num1)), 3)
+            if level[i][j] == 4:
+                pygame.draw.line(surface, color, (int(j * num2), int(i * num1 + (0.5 * num1))),
+                                 (int(j * num2 + num2), int(i * num1 + (0.5 * num1))), 3)
+            if level[i][j] == 5:
+                pygame.draw.arc(surface, color, [int(j * num2 - (num2 * 0.4) - 2), int(i * num1 + (0.5 * num1)), int(num2), int(num1)],
+                                0, PI / 2, 3)
+            if level[i][j] == 6:
+                pygame.draw.arc(surface, color,
+                                [int(j * num2 + (num2 * 0.5)), int(i * num1 + (0.5 * num1)), int(num2), int(num1)], PI / 2, PI, 3)
+            if level[i][j] == 7:
+                pygame.draw.arc(surface, color, [int(j * num2 + (num2 * 0.5)), int(i * num1 - (0.4 * num1)), int(num2), int(num1)], PI,
+                                3 * PI / 2, 3)
+            if level[i][j] == 8:
+                pygame.draw.arc(surface, color,
+                                [int(j * num2 - (num2 * 0.4) - 2), int(i * num1 - (0.4 * num1)), int(num2), int(num1)], 3 * PI / 2,
+                                2 * PI, 3)
+            if level[i][j] == 9:
+                pygame.draw.line(surface, 'white', (int(j * num2), int(i * num1 + (0.5 * num1))),
+                                 (int(j * num2 + num2), int(i * num1 + (0.5 * num1))), 3)
+
+
+def get_wall_surface(sim):
+    # Walls (tiles 3-9) never change within a level, so render them once per board and color
+    key = (sim.board_index, color)
+    walls = wall_surfaces.get(key)
+    if walls is None:
+        walls = pygame.Surface((WIDTH, HEIGHT)).convert()
+        walls.fill('black')
+        draw_walls(walls, sim.level)
+        wall_surfaces[key] = walls
+    return walls
+
+
+class BoardLayer:
+    # Walls plus the small dots of one level. Eaten cells are erased one at a time, power
+    # pellets are kept out of the surface and drawn as a flickering overlay.
+    def __init__(self, sim):
+        self.walls = get_wall_surface(sim)
+        self.surface = self.walls.copy()
+        self.power_pellets = []
+        # screen regions changed since the renderer last looked
+        self.dirty = []
+        level = sim.level
+        for i in range(len(level)):
+            for j in range(len(level[i])):
+                if level[i][j] == 1:
+                    pygame.draw.circle(self.surface, 'white', self.cell_center(i, j), 4)
+                if level[i][j] == 2:
+                    self.power_pellets.append((i, j))
+
+    @staticmethod
+    def cell_center(row, col):
+        num1 = ((HEIGHT - 50) // 32)
+        num2 = (WIDTH // 30)
+        return int(col * num2 + (0.5 * num2)), int(row * num1 + (0.5 * num1))
+
+    def pellet_rect(self, row, col):
+        x, y = self.cell_center(row, col)
+        return pygame.Rect(x - 11, y - 11, 22, 22)
+
+    def erase(self, row, col):
+        # restore the dot's footprint from the bare wall layer
+        if (row, col) in self.power_pellets:
+            self.power_pellets.remove((row, col))
+            self.dirty.append(self.pellet_rect(row, col))
+            return
+        x, y = self.cell_center(row, col)
+        area = pygame.Rect(x - 5, y - 5, 10, 10)
+        self.surface.blit(self.walls, area, area)
+        self.dirty.append(area)
+
+
+def draw_board(sim, layer):
+    screen.blit(layer.surface, (0, 0))
+    if not sim.flicker:
+        for row, col in layer.power_pellets:
+            pygame.draw.circle(screen, 'white', layer.cell_center(row, col), 10)
+
+
+def draw_pause_button(rect):
+    pygame.draw.rect(screen, (50, 50, 70), rect, border_radius=5)
+    pygame.draw.rect(screen, (100, 100, 150), rect, 2, border_radius=5)
+    pause_text = render_text("PAUSE", 20, 'white')
+    text_rect = pause_text.get_rect(center=rect.center)
+    screen.blit(pause_text, text_rect)
+
+
+def entity_positions(sim):
+    # player first, then the ghosts
+    return [(sim.player_x, sim.player_y)] + [(ghost.x_pos, ghost.y_pos) for ghost in sim.ghosts]
+
+
+def interpolate(previous, current, alpha):
+    # positions alpha of the way from the previous tick to the current one
+    positions = []
+    for (x0, y0), (x1, y1) in zip(previous, current):
+        if abs(x1 - x0) > SNAP_DISTANCE or abs(y1 - y0) > SNAP_DISTANCE:
+            positions.append((x1, y1))
+        else:
+            positions.append((x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha))
+    return positions
+
+
+def draw_player(sim, pos=None):
+    # 0-RIGHT, 1-LEFT, 2-UP, 3-DOWN
+    if 0 <= sim.direction <= 3:
+        screen.blit(player_sprites[sim.counter // 5][sim.direction], pos or (sim.player_x, sim.player_y))
+
+
+def draw_ghosts(sim, positions=None):
+    # collected first and handed to pygame in one blits() call, which matters with a swarm
+    sprites = []
+    for ghost in sim.ghosts:
+        dead = ghost.dead
+        eaten = sim.eaten_ghost[ghost.id]
+        normal, spooked, dead_look = ghost_sprites[ghost.kind]
+        pos = positions[ghost.id] if positions else (ghost.x_pos, ghost.y_pos)
+        if (not sim.powerup and not dead) or (eaten and sim.powerup and not dead):
+            sprites.append((normal, pos))
+        elif sim.powerup and not dead and not eaten:
+            sprites.append((spooked, pos))
+        else:
+            sprites.append((dead_look, pos))
+    screen.blits(sprites, False)
+
+
+class DirtyRectRenderer:
+    # Keeps the screen in sync with the simulation by repainting only the regions that
+    # changed: old and new sprite boxes, eaten pellets, the power pellet overlay and the
+    # HUD when its values change. draw() returns the rects to pass to display.update().
+    HUD_RECT = pygame.Rect(0, 0, WIDTH, 52)
+
+    def __init__(self, layer, pause_rect, level_num):
+        self.layer = layer
+        self.pause_rect = pause_rect
+        self.level_num = level_num
+        self.screen_rect = screen.get_rect()
+        self.sprite_rects = []
+        self.hud_state = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        # the screen was drawn some other way, repaint everything next time
+        self.full_redraw = True
+
+    def sprite_boxes(self, positions):
+        boxes = [pygame.Rect(int(x), int(y), 45, 45) for x, y in positions]
+        return [box.inflate(2, 2).clip(self.screen_rect) for box in boxes]
+
+    def draw(self, sim, positions=None):
+        # positions: interpolated player and ghost positions, see entity_positions()
+        layer = self.layer
+        positions = positions or entity_positions(sim)
+        hud_state = (sim.score, sim.lives, self.level_num)
+        if self.full_redraw or len(positions) > MAX_DIRTY_SPRITES:
+            draw_board(sim, layer)
+            draw_player(sim, positions[0])
+            draw_ghosts(sim, positions[1:])
+            draw_misc(sim, self.level_num)
+            draw_pause_button(self.pause_rect)
+            layer.dirty.clear()
+            self.sprite_rects = self.sprite_boxes(positions)
+            self.hud_state = hud_state
+            self.full_redraw = False
+            return [self.screen_rect]
+
+        dirty = self.sprite_rects + layer.dirty
+        layer.dirty = []
+        screen.blits([(layer.surface, rect, rect) for rect in dirty], False)
+        for row, col in layer.power_pellets:
+            rect = layer.pellet_rect(row, col)
+            screen.blit(layer.surface, rect, rect)
+            if not sim.flicker:
+                pygame.draw.circle(screen, 'white', layer.cell_center(row, col), 10)
+            dirty.append(rect)
+        draw_player(sim, positions[0])
+        draw_ghosts(sim, positions[1:])
+        self.sprite_rects = self.sprite_boxes(positions)
+        dirty.extend(self.sprite_rects)
+        if hud_state != self.hud_state or any(rect.colliderect(self.HUD_RECT) for rect in dirty):
+            draw_misc(sim, self.level_num)
+            draw_pause_button(self.pause_rect)
+            self.hud_state = hud_state
+            dirty.append(self.HUD_RECT)
+        return dirty
+
+
+def play_level(state, speed_mult=1.0, extra_ghosts=0, board_index=0, dirty_rects=None, seed=None):
+    # Plays state.level on the given board; score and lives are read from and written back to state
+    init_display()
+    if dirty_rects is None:
+        dirty_rects = DIRTY_RECTS
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    # The simulation loads the board and randomizes bonus positions, the log records the inputs
+    log = state.replay = InputLog(board_index, speed_mult, state.lives, state.score, seed, state.level,
+                                  extra_ghosts=extra_ghosts)
+    sim = state.sim = log.new_simulation()
+    board_layer = BoardLayer(sim)
+
+    paused = False
+    pause_rect = pygame.Rect(WIDTH - 100, 10, 80, 30)
+
+    # Pause menu buttons
+    btn_width = 250
+    btn_height = 50
+    spacing = 20
+    start_y = HEIGHT // 2 - 60
+
+    resume_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y, btn_width, btn_height)
+    restart_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + btn_height + spacing, btn_width, btn_height)
+    menu_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + (btn_height + spacing) * 2, btn_width, btn_height)
+    quit_rect = pygame.Rect(WIDTH // 2 - btn_width // 2, start_y + (btn_height + spacing) * 3, btn_width, btn_height)
+
+    renderer = DirtyRectRenderer(board_layer, pause_rect, state.level) if dirty_rects else None
+
+    # Fixed timestep: frame time is collected in accumulator and spent in TICK_MS steps,
+    # what is left over places the sprites between the previous and the current tick
+    accumulator = 0.0
+    previous = entity_positions(sim)
+    # Direction queued for the next tick, None keeps the simulation's current command
+    command = None
+    result = None
+    # start timing here, the menus and the level intro must not count as a first frame
+    timer.tick()
+    while result is None:
+        frame_ms = timer.tick(fps)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                result = "QUIT"
+            elif paused:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE:
+                        paused = not paused
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if pause_rect.collidepoint(event.pos):
+                        paused = not paused
+                    elif resume_rect.collidepoint(event.pos):
+                        paused = False
+                    elif restart_rect.collidepoint(event.pos):
+                        result = "RESTART"
+                    elif menu_rect.collidepoint(event.pos):
+                        result = "MENU"
+                    elif quit_rect.collidepoint(event.pos):
+                        result = "QUIT"
+            else:
+                if event.type == pygame.KEYDOWN:
+                    if not sim.game_over and not sim.game_won:
+                        if event.key == pygame.K_RIGHT:
+                            command = 0
+                        if event.key == pygame.K_LEFT:
+                            command = 1
+                        if event.key == pygame.K_UP:
+                            command = 2
+                        if event.key == pygame.K_DOWN:
+                            command = 3
+                    if event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE:
+                        if sim.game_over:
+                            if event.key == pygame.K_SPACE:
+                                result = "GAMEOVER"
+                            else:
+                                result = "QUIT"
+                        elif sim.game_won:
+                            if event.key == pygame.K_SPACE:
+                                result = "VICTORY"
+                            else:
+                                result = "QUIT"
+                        # Toggle pause if game is running normally
+                        else:
+                            paused = not paused
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    # Check if pause button was clicked
+                    if pause_rect.collidepoint(event.pos):
+                        paused = not paused
+
+                if event.type == pygame.KEYUP:
+                    queued = sim.direction_command if command is None else command
+                    if event.key == pygame.K_RIGHT and queued == 0:
+                        command = sim.direction
+                    if event.key == pygame.K_LEFT and queued == 1:
+                        command = sim.direction
+                    if event.key == pygame.K_UP and queued == 2:
+                        command = sim.direction
+                    if event.key == pygame.K_DOWN and queued == 3:
+                        command = sim.direction
+        if result is not None:
+            break
+
+        if paused:
+            accumulator = 0.0
+        else:
+            accumulator += min(frame_ms, MAX_FRAME_MS)
+            while accumulator >= TICK_MS:
+                previous = entity_positions(sim)
+                log.record(sim, command)
+                sim.step(command)
+                command = None
+                for tile in sim.eaten_tiles:
+                    board_layer.erase(*tile)
+                accumulator -= TICK_MS
+        positions = entity_positions(sim)
+        if INTERPOLATE:
+            positions = interpolate(previous, positions, accumulator / TICK_MS)
+
+        if renderer and not paused and not sim.game_over and not sim.game_won:
+            pygame.display.update(renderer.draw(sim, positions))
+            continue
+        if renderer:
+            # overlays cover the whole screen, repaint fully once they are gone
+            renderer.invalidate()
+
+        draw_board(sim, board_layer)
+        draw_player(sim, positions[0])
+        draw_ghosts(sim, positions[1:])
+        draw_misc(sim, state.level)
+
+        # Draw Pause Button (Top Right, non-colliding)
+        draw_pause_button(pause_rect)
+
+        if paused:
+            # Draw Pause Overlay (Pac-Man 256 Style)
+            screen.blit(get_pause_overlay(), (0, 0))
+            
+            # PAUSED Title
+            paused_text = render_text("PAUSED", 80, 'white')
+            paused_rect = paused_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 150))
+            screen.blit(paused_text, paused_rect)
+            
+            mouse_pos = pygame.mouse.get_pos()
+            
+            # Helper to draw cyber button
+            def draw_cyber_btn(rect, text, hover):
+                color = (252, 238, 10) if hover else (20, 20, 30) # Cyber Yellow / Dark
+                border_color = (255, 255, 255) if hover else (0, 240, 255) # White / Cyber Blue
+                text_color = (0, 0, 0) if hover else (0, 240, 255) # Black / Cyber Blue
+                
+                # Chamfered corners
+                cut = 10
+                x, y, w, h = rect.x, rect.y, rect.width, rect.height
+                points = [
+                    (x + cut, y), (x + w, y), (x + w, y + h - cut),
+                    (x + w - cut, y + h), (x, y + h), (x, y + cut)
+                ]
+                
+                pygame.draw.polygon(screen, color, points)
+                pygame.draw.polygon(screen, border_color, points, 2)
+                
+                txt_surf = render_text(text, 20, text_color)
+                txt_rect = txt_surf.get_rect(center=rect.center)
+                screen.blit(txt_surf, txt_rect)
+
+            draw_cyber_btn(resume_rect, "RESUME", resume_rect.collidepoint(mouse_pos))
+            draw_cyber_btn(restart_rect, "RESTART", restart_rect.collidepoint(mouse_pos))
+            draw_cyber_btn(menu_rect, "MENU", menu_rect.collidepoint(mouse_pos))
+            draw_cyber_btn(quit_rect, "QUIT", quit_rect.collidepoint(mouse_pos))
+
+        pygame.display.flip()
+
+    log.finish(sim)
+    if REPLAY_DIR:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        log.save(os.path.join(REPLAY_DIR, f'level{state.level}_{seed}.pmr'))
+
+    # Hand score and lives back to the caller
+    state.score = sim.score
+    state.lives = sim.lives
+    return result
+
+if __name__ == "__main__":
+    play_level(GameState())
+    pygame.quit()
+
+
+# sound effects, restart and winning messages
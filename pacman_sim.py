@@ -0,0 +1,135 @@
+# Headless bulk runner: plays many complete games with a simple bot across all cores.
+#
+#   python -m pacman_sim --games 10000 --workers 8
+#
+# Each game goes through the same level progression as GameManager.start_game (both use
+# simulation.level_settings) with score and lives carried over. Game i always
+# uses seed base_seed + i, so a run is reproducible and any single game can be replayed
+# with play_game(seed). Results are folded into the totals as workers finish them, so
+# memory stays flat no matter how many games are played.
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pathfinding import REVERSE, STEPS
+from simulation import Simulation, level_settings
+
+# ticks allowed per level before the game is called off (about 5 minutes at 60 FPS)
+MAX_LEVEL_TICKS = 18000
+# the bot picks a new direction at a junction with this chance
+TURN_CHANCE = 0.5
+
+
+def has_pellet(sim, direction):
+    row = (sim.player_y + 24) // 28 + STEPS[direction][0]
+    col = ((sim.player_x + 23) // 30 + STEPS[direction][1]) % len(sim.level[0])
+    return 0 <= row < len(sim.level) and sim.level[row][col] in (1, 2)
+
+
+def bot_command(sim, rng):
+    # Wanders the maze: keeps going straight, picks a random open way (not back) at
+    # junctions every now and then and when it runs into a wall, preferring ways with food.
+    options = [d for d in range(4) if sim.turns_allowed[d] and d != REVERSE[sim.direction]]
+    if not options:
+        return REVERSE[sim.direction]
+    food = [d for d in options if has_pellet(sim, d)]
+    if food and not has_pellet(sim, sim.direction):
+        return rng.choice(food)
+    options = food or options
+    if not sim.turns_allowed[sim.direction] or (len(options) > 1 and rng.random() < TURN_CHANCE):
+        return rng.choice(options)
+    return None
+
+
+def play_game(seed, max_level=10, lives=3, extra_ghosts=0, swept=None):
+    # Returns (score, levels cleared, ticks survived) for one deterministic game
+    rng = random.Random(seed)
+    score = 0
+    ticks = 0
+    cleared = 0
+    for level in range(1, max_level + 1):
+        speed_mult, board_index = level_settings(level)
+        sim = Simulation(board_index, speed_mult, lives=lives, score=score, seed=rng.getrandbits(32),
+                         extra_ghosts=extra_ghosts, swept=swept)
+        last_seen = None
+        while not sim.game_over and not sim.game_won and sim.tick < MAX_LEVEL_TICKS:
+            # only think when the open ways change, like a player tapping keys at corners
+            seen = (sim.direction, *sim.turns_allowed)
+            command = bot_command(sim, rng) if seen != last_seen else None
+            last_seen = seen
+            sim.step(command)
+        ticks += sim.tick
+        score = sim.score
+        lives = sim.lives
+        if not sim.game_won:
+            break
+        cleared += 1
+    return score, cleared, ticks
+
+
+class Stats:
+    # Running count, mean, spread and range of one measure (Welford's method)
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = None
+        self.high = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.low = value if self.low is None else min(self.low, value)
+        self.high = value if self.high is None else max(self.high, value)
+
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def describe(self):
+        return f'mean {self.mean:10.1f}  sd {self.stdev():9.1f}  min {self.low:8}  max {self.high:8}'
+
+
+def run(games, workers=None, base_seed=0, max_level=10, chunksize=16, progress=None, extra_ghosts=0, swept=None):
+    # Plays games base_seed .. base_seed + games - 1 and returns a dict of Stats
+    totals = {'score': Stats(), 'levels cleared': Stats(), 'ticks survived': Stats()}
+    seeds = range(base_seed, base_seed + games)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(play_game, seeds, [max_level] * games, [3] * games, [extra_ghosts] * games,
+                           [swept] * games, chunksize=chunksize)
+        for done, (score, cleared, ticks) in enumerate(results, 1):
+            totals['score'].add(score)
+            totals['levels cleared'].add(cleared)
+            totals['ticks survived'].add(ticks)
+            if progress and done % progress == 0:
+                print(f'{done}/{games} games, mean score {totals["score"].mean:.1f}', flush=True)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play headless Pac-Man games in parallel and summarize them.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--max-level', type=int, default=10, help='stop a game after clearing this level')
+    parser.add_argument('--extra-ghosts', type=int, default=0, help='ghosts added to the usual four')
+    parser.add_argument('--swept', action='store_true', default=None,
+                        help='use the swept movement that holds at any speed (simulation.SWEPT_MOVES)')
+    parser.add_argument('--progress', type=int, default=0, help='print a line every N games')
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    totals = run(args.games, args.workers, args.seed, args.max_level, progress=args.progress,
+                 extra_ghosts=args.extra_ghosts, swept=args.swept)
+    elapsed = time.time() - start
+    print(f'{args.games} games on {args.workers} workers in {elapsed:.1f}s')
+    for name, stats in totals.items():
+        print(f'{name:>15}: {stats.describe()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Background particles for the menu screens.
+# Positions, speeds, sizes and colors live in flat arrays so a frame is a handful of
+# vectorized operations plus one Surface.blits call, which keeps thousands of particles
+# cheap. NumPy is used when it is installed, otherwise the same arrays are updated in a loop.
+import random
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# particle counts for each performance tier, see GameManager
+PARTICLE_TIERS = {
+    'low': 50,
+    'medium': 500,
+    'high': 3000,
+}
+SIZES = (2, 3, 4)
+
+
+class ParticleField:
+    def __init__(self, count, width, height, colors):
+        self.count = count
+        self.width = width
+        self.height = height
+        self.colors = colors
+        # every (color, size, alpha) square is built up front, indexed by sprite_index()
+        self.sprites = []
+        for color in colors:
+            for size in SIZES:
+                for alpha in range(256):
+                    s = pygame.Surface((size, size), pygame.SRCALPHA)
+                    s.fill((*color, alpha))
+                    self.sprites.append(s)
+        if np is not None:
+            rng = np.random.default_rng()
+            self.rng = rng
+            self.x = rng.integers(0, width + 1, count)
+            self.y = rng.integers(0, height + 1, count).astype(np.float64)
+            self.speed = rng.uniform(0.2, 1.5, count)
+            self.size = rng.integers(0, len(SIZES), count)
+            self.color = rng.integers(0, len(colors), count)
+        else:
+            self.x = [random.randint(0, width) for _ in range(count)]
+            self.y = [float(random.randint(0, height)) for _ in range(count)]
+            self.speed = [random.uniform(0.2, 1.5) for _ in range(count)]
+            self.size = [random.randrange(len(SIZES)) for _ in range(count)]
+            self.color = [random.randrange(len(colors)) for _ in range(count)]
+
+    def sprite_index(self, color, size, alpha):
+        return (color * len(SIZES) + size) * 256 + alpha
+
+    def update(self):
+        # drift upwards, particles leaving the top come back at the bottom somewhere else
+        if np is not None:
+            self.y -= self.speed
+            wrapped = self.y < 0
+            self.y[wrapped] = self.height
+            self.x[wrapped] = self.rng.integers(0, self.width + 1, int(wrapped.sum()))
+            return
+        for i in range(self.count):
+            self.y[i] -= self.speed[i]
+            if self.y[i] < 0:
+                self.y[i] = self.height
+                self.x[i] = random.randint(0, self.width)
+
+    def draw(self, surface):
+        # Fade out at top
+        if np is not None:
+            alpha = (100 + 155 * (self.y / self.height)).astype(np.int64)
+            index = self.sprite_index(self.color, self.size, alpha).tolist()
+            positions = zip(self.x.tolist(), self.y.astype(np.int64).tolist())
+        else:
+            index = [self.sprite_index(self.color[i], self.size[i], int(100 + 155 * (self.y[i] / self.height)))
+                     for i in range(self.count)]
+            positions = zip(self.x, [int(y) for y in self.y])
+        sprites = self.sprites
+        surface.blits([(sprites[i], pos) for i, pos in zip(index, positions)], False)
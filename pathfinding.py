@@ -0,0 +1,168 @@
+# Shortest paths between the walkable tiles of a board.
+# A board's junction table (see simulation.Maze) is turned into a graph of open tiles and
+# a breadth-first search from every tile fills an all-pairs distance table of uint16 steps.
+# Ghosts then pick a turn with one lookup per open exit instead of comparing pixels with
+# their target. Building the table takes a moment in pure Python, so it is written to
+# CACHE_DIR and loaded from there on later runs.
+#
+# A row of the table is a flow field: the distance from every tile to one goal. field()
+# hands out these rows as shared views, so all ghosts chasing the player (or running to
+# the same corner) read one field that only changes when the target's tile does.
+import array
+import hashlib
+import os
+import tempfile
+from collections import deque
+
+CACHE_DIR = os.path.join('assets', '.cache')
+UNREACHABLE = 0xFFFF
+# (row, col) step of junction bits 1, 2, 4, 8: right, left, up, down
+STEPS = ((0, 1), (0, -1), (-1, 0), (1, 0))
+REVERSE = (1, 0, 3, 2)
+# the two directions at right angles to each direction
+SIDES = ((2, 3), (2, 3), (0, 1), (0, 1))
+TILE_H = 28
+TILE_W = 30
+
+
+class PathTable:
+    # node[tile] is the graph node of tile = row * cols + col (-1 for walls), nearest[tile]
+    # the closest node to any tile, neighbours[node * 4 + direction] the node one step that
+    # way (-1 if closed) and dist[a * count + b] the number of steps between two nodes.
+    # fields caches the flow field of each target tile handed out so far.
+    __slots__ = ('rows', 'cols', 'count', 'node', 'nearest', 'neighbours', 'dist', 'fields')
+
+    def __init__(self, exits):
+        self.rows = len(exits)
+        self.cols = len(exits[0])
+        self.node = array.array('i', [-1]) * (self.rows * self.cols)
+        tiles = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if exits[row][col] & 16:
+                    self.node[row * self.cols + col] = len(tiles)
+                    tiles.append((row, col))
+        self.count = len(tiles)
+        self.neighbours = array.array('i', [-1]) * (self.count * 4)
+        for n, (row, col) in enumerate(tiles):
+            for direction, (d_row, d_col) in enumerate(STEPS):
+                if exits[row][col] & (1 << direction):
+                    tile = (row + d_row) % self.rows * self.cols + (col + d_col) % self.cols
+                    self.neighbours[n * 4 + direction] = self.node[tile]
+        if not self.load(exits):
+            self.build(tiles)
+            self.save(exits)
+        self.fields = {}
+
+    def build(self, tiles):
+        count = self.count
+        self.dist = array.array('H', [UNREACHABLE]) * (count * count)
+        neighbours = self.neighbours
+        for start in range(count):
+            base = start * count
+            self.dist[base + start] = 0
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                steps = self.dist[base + current] + 1
+                for k in range(current * 4, current * 4 + 4):
+                    nxt = neighbours[k]
+                    if nxt >= 0 and self.dist[base + nxt] == UNREACHABLE:
+                        self.dist[base + nxt] = steps
+                        queue.append(nxt)
+        # walls and off-board targets stand for the closest open tile
+        self.nearest = array.array('H', [0]) * (self.rows * self.cols)
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self.nearest[row * self.cols + col] = min(
+                    range(count), key=lambda n: abs(tiles[n][0] - row) + abs(tiles[n][1] - col))
+
+    def cache_path(self, exits):
+        digest = hashlib.sha1(bytes(bits for row in exits for bits in row)).hexdigest()[:16]
+        return os.path.join(CACHE_DIR, f'paths_{digest}.bin')
+
+    def load(self, exits):
+        # a missing, truncated or otherwise broken cache file just means building the table again
+        path = self.cache_path(exits)
+        size = (self.rows * self.cols + self.count * self.count) * 2
+        try:
+            if os.path.getsize(path) != size:
+                return False
+            nearest = array.array('H')
+            dist = array.array('H')
+            with open(path, 'rb') as f:
+                nearest.fromfile(f, self.rows * self.cols)
+                dist.fromfile(f, self.count * self.count)
+        except (EOFError, OSError, ValueError):
+            return False
+        self.nearest = nearest
+        self.dist = dist
+        return True
+
+    def save(self, exits):
+        # written to a temporary file first and moved into place, so an interrupted run or
+        # several pacman_sim workers saving at once never leave a half-written cache
+        temp = None
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                self.nearest.tofile(f)
+                self.dist.tofile(f)
+            os.replace(temp, self.cache_path(exits))
+        except OSError:
+            # a read-only install just builds the table on every start
+            if temp is not None and os.path.exists(temp):
+                os.remove(temp)
+
+    def field(self, x, y):
+        # Steps from every node to a target given as a sprite's top-left pixel, like
+        # get_targets returns. Walls and off-board targets use the closest open tile.
+        row = int((y + 22) // TILE_H)
+        col = int((x + 22) // TILE_W)
+        if not 0 <= row < self.rows:
+            row = 0 if row < 0 else self.rows - 1
+        if not 0 <= col < self.cols:
+            col = 0 if col < 0 else self.cols - 1
+        tile = row * self.cols + col
+        field = self.fields.get(tile)
+        if field is None:
+            goal = self.nearest[tile]
+            field = self.fields[tile] = memoryview(self.dist)[goal * self.count:(goal + 1) * self.count]
+        return field
+
+    def best_turn(self, center_x, center_y, field, turns, direction):
+        # Open direction whose next tile is closest to the field's goal. Between junctions the
+        # ghost just keeps going; turning back is only picked when nothing else is open and
+        # ties keep the current direction. Returns None when the ghost is off the graph or
+        # the target cannot be reached.
+        if turns[direction] and not turns[SIDES[direction][0]] and not turns[SIDES[direction][1]]:
+            return direction
+        row = int(center_y // TILE_H)
+        col = int(center_x // TILE_W)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        here = self.node[row * self.cols + col]
+        if here < 0:
+            return None
+        options = self.neighbours[here * 4:here * 4 + 4]
+        reverse = REVERSE[direction]
+        best = None
+        best_key = UNREACHABLE * 16
+        for d in range(4):
+            nxt = options[d]
+            if nxt < 0 or not turns[d]:
+                continue
+            steps = field[nxt]
+            if steps == UNREACHABLE:
+                continue
+            # reverse last, then fewest steps, then straight on, then R, L, U, D
+            key = steps * 8 + d
+            if d == reverse:
+                key += UNREACHABLE * 8
+            elif d != direction:
+                key += 4
+            if key < best_key:
+                best = d
+                best_key = key
+        return best
@@ -0,0 +1,417 @@
+# Input recording and headless replays of single levels.
+#
+# play_level fills an InputLog while the level is played: the settings the Simulation was
+# built with (including the seed behind randomize_bonuses) and the ticks at which
+# direction_command changed. Since the simulation is deterministic, that is enough to
+# play the level again tick for tick:
+#
+#   python replay.py replays/level1.pmr            # headless, as fast as possible
+#   python replay.py replays/level1.pmr --render 4 # draw every 4th tick in the game window
+#   python replay.py replays/level1.pmr --seek 3000
+#
+# File format (all numbers little endian):
+#   header   HEADER: magic, version, compression, board, speed, seed, level, lives, score,
+#            ticks per block, extra ghosts, swept movement
+#   blocks   BLOCK (first tick, raw size, packed size) + zlib/lzma packed payload, one per
+#            keyframe interval. A payload is an optional keyframe (full simulation state and
+#            pellet bitmap at the first tick) followed by the input changes of the block as
+#            varints of (tick delta * 4 + command).
+#   end      a BLOCK with first tick END_BLOCK, SUMMARY (ticks, final score and lives),
+#            the block index (INDEX_ENTRY per block) and TRAILER pointing at the index.
+# Blocks can be read one after the other from any stream; the index at the end lets a
+# ReplayReader over a memory-mapped file jump straight to the keyframe before a tick.
+import argparse
+import lzma
+import mmap
+import struct
+import zlib
+
+from simulation import Simulation
+
+MAGIC = b'PMRP'
+END_MAGIC = b'PMRE'
+VERSION = 3
+KEYFRAME_INTERVAL = 600
+END_BLOCK = 0xFFFFFFFF
+COMPRESSORS = {
+    'none': (0, lambda data: data, lambda data: data),
+    'zlib': (1, zlib.compress, zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress),
+}
+DECOMPRESS = {code: unpack for code, _, unpack in COMPRESSORS.values()}
+
+HEADER = struct.Struct('<4sBBBdQIIIIH?')
+BLOCK = struct.Struct('<III')
+SUMMARY = struct.Struct('<III')
+INDEX_ENTRY = struct.Struct('<IQ?')
+TRAILER = struct.Struct('<QI4s')
+# tick, score, lives, counter, flags, startup counter, power counter, number of ghosts,
+# player x/y, direction, queued direction
+KEYFRAME = struct.Struct('<IIBBBBHHiiBB')
+# x, y, target x, target y, direction, dead/in box/eaten flags
+GHOST_FRAME = struct.Struct('<ddddBB')
+FLAG_NAMES = ('flicker', 'moving', 'powerup', 'game_over', 'game_won')
+
+
+def write_varint(buf, value):
+    while value >= 0x80:
+        buf.append(value & 0x7F | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def number(value):
+    # positions are stored as doubles, whole numbers go back to ints like the simulation uses
+    return int(value) if value.is_integer() else value
+
+
+def capture_keyframe(sim):
+    # Everything step() reads from the previous tick, packed into bytes
+    flags = 0
+    for bit, name in enumerate(FLAG_NAMES):
+        if getattr(sim, name):
+            flags |= 1 << bit
+    data = bytearray(KEYFRAME.pack(sim.tick, sim.score, sim.lives, sim.counter, flags, sim.startup_counter,
+                                   sim.power_counter, len(sim.ghosts), sim.player_x, sim.player_y, sim.direction,
+                                   sim.direction_command))
+    for ghost, (target_x, target_y), eaten in zip(sim.ghosts, sim.targets, sim.eaten_ghost):
+        data += GHOST_FRAME.pack(ghost.x_pos, ghost.y_pos, target_x, target_y, ghost.direction,
+                                 ghost.dead | ghost.in_box << 1 | eaten << 2)
+    # one bit per cell, set while the cell still holds a dot or power pellet
+    bits = 0
+    for i, cell in enumerate(sim.grid):
+        if cell == 1 or cell == 2:
+            bits |= 1 << i
+    data += bits.to_bytes((len(sim.grid) + 7) // 8, 'little')
+    return bytes(data)
+
+
+def decode_keyframe(data):
+    # Keyframe bytes as a dict, for analysis without building a Simulation
+    (tick, score, lives, counter, flags, startup_counter, power_counter, count, player_x, player_y,
+     direction, direction_command) = KEYFRAME.unpack_from(data)
+    frame = {'tick': tick, 'score': score, 'lives': lives, 'counter': counter,
+             'startup_counter': startup_counter, 'power_counter': power_counter, 'eaten_ghost': [],
+             'player_x': player_x, 'player_y': player_y, 'direction': direction,
+             'direction_command': direction_command, 'ghosts': [], 'targets': []}
+    for bit, name in enumerate(FLAG_NAMES):
+        frame[name] = bool(flags >> bit & 1)
+    pos = KEYFRAME.size
+    for _ in range(count):
+        x, y, target_x, target_y, ghost_direction, ghost_flags = GHOST_FRAME.unpack_from(data, pos)
+        frame['ghosts'].append((number(x), number(y), ghost_direction, bool(ghost_flags & 1), bool(ghost_flags & 2)))
+        frame['targets'].append((number(target_x), number(target_y)))
+        frame['eaten_ghost'].append(bool(ghost_flags & 4))
+        pos += GHOST_FRAME.size
+    frame['pellets'] = int.from_bytes(data[pos:], 'little')
+    return frame
+
+
+def apply_keyframe(sim, data):
+    # Puts a freshly built Simulation of the same level into the keyframe's state
+    frame = decode_keyframe(data)
+    for name in ('tick', 'score', 'lives', 'counter', 'startup_counter', 'power_counter', 'eaten_ghost',
+                 'player_x', 'player_y', 'direction', 'direction_command', 'targets') + FLAG_NAMES:
+        setattr(sim, name, frame[name])
+    for ghost, (x, y, direction, dead, in_box) in zip(sim.ghosts, frame['ghosts']):
+        ghost.x_pos, ghost.y_pos, ghost.direction, ghost.dead, ghost.in_box = x, y, direction, dead, in_box
+    pellets = frame['pellets']
+    for i, cell in enumerate(sim.grid):
+        if (cell == 1 or cell == 2) and not pellets >> i & 1:
+            sim.grid[i] = 0
+    sim.grid_bytes = None
+    return sim
+
+
+class InputLog:
+    # Settings of one level plus (tick, command) pairs for every direction_command change
+    # and a keyframe every keyframe_interval ticks. ticks, final_score and final_lives are
+    # filled in by finish() when the level ends.
+    __slots__ = ('board_index', 'speed_mult', 'lives', 'score', 'seed', 'level', 'extra_ghosts', 'swept',
+                 'commands', 'keyframes', 'keyframe_interval', 'ticks', 'final_score', 'final_lives')
+
+    def __init__(self, board_index, speed_mult, lives, score, seed, level=1, keyframe_interval=KEYFRAME_INTERVAL,
+                 extra_ghosts=0, swept=None):
+        self.board_index = board_index
+        self.speed_mult = speed_mult
+        self.extra_ghosts = extra_ghosts
+        # movement model, None until new_simulation() picks simulation.SWEPT_MOVES
+        self.swept = swept
+        self.lives = lives
+        self.score = score
+        self.seed = seed
+        self.level = level
+        self.commands = []
+        # keyframe bytes keyed by tick, 0 turns them off
+        self.keyframes = {}
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        self.final_score = score
+        self.final_lives = lives
+
+    def record(self, sim, command):
+        # call right before sim.step(command); repeats of the queued command change nothing
+        if self.keyframe_interval and sim.tick % self.keyframe_interval == 0:
+            self.keyframes[sim.tick] = capture_keyframe(sim)
+        if command is not None and command != sim.direction_command and not sim.game_over and not sim.game_won:
+            self.commands.append((sim.tick, command))
+
+    def finish(self, sim):
+        self.ticks = sim.tick
+        self.final_score = sim.score
+        self.final_lives = sim.lives
+
+    def new_simulation(self):
+        sim = Simulation(self.board_index, self.speed_mult, lives=self.lives, score=self.score, seed=self.seed,
+                         extra_ghosts=self.extra_ghosts, swept=self.swept)
+        self.swept = sim.swept
+        return sim
+
+    def save(self, path, compression='zlib'):
+        with open(path, 'wb') as f:
+            write_replay(f, self, compression)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return read_replay(f)
+
+
+def write_replay(f, log, compression='zlib'):
+    code, pack, _ = COMPRESSORS[compression]
+    interval = log.keyframe_interval or KEYFRAME_INTERVAL
+    f.write(HEADER.pack(MAGIC, VERSION, code, log.board_index, log.speed_mult, log.seed, log.level,
+                        log.lives, log.score, interval, log.extra_ghosts, bool(log.swept)))
+    offset = HEADER.size
+    index = []
+    commands = log.commands
+    c = 0
+    for start in range(0, log.ticks + 1, interval):
+        payload = bytearray()
+        keyframe = log.keyframes.get(start)
+        if keyframe is None:
+            write_varint(payload, 0)
+        else:
+            write_varint(payload, len(keyframe))
+            payload += keyframe
+        end = c
+        while end < len(commands) and commands[end][0] < start + interval:
+            end += 1
+        write_varint(payload, end - c)
+        previous = start
+        for tick, command in commands[c:end]:
+            write_varint(payload, (tick - previous) * 4 + command)
+            previous = tick
+        c = end
+        packed = pack(bytes(payload))
+        f.write(BLOCK.pack(start, len(payload), len(packed)))
+        f.write(packed)
+        index.append((start, offset, keyframe is not None))
+        offset += BLOCK.size + len(packed)
+    f.write(BLOCK.pack(END_BLOCK, 0, 0))
+    f.write(SUMMARY.pack(log.ticks, log.final_score, log.final_lives))
+    index_offset = offset + BLOCK.size + SUMMARY.size
+    for entry in index:
+        f.write(INDEX_ENTRY.pack(*entry))
+    f.write(TRAILER.pack(index_offset, len(index), END_MAGIC))
+
+
+def parse_header(data):
+    magic, version, code, board_index, speed_mult, seed, level, lives, score, interval, extra_ghosts, swept = \
+        HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError('not a Pac-Man replay file')
+    if version != VERSION:
+        raise ValueError(f'replay file version {version} is not supported, expected {VERSION}')
+    log = InputLog(board_index, speed_mult, lives, score, seed, level, interval, extra_ghosts, swept)
+    return log, DECOMPRESS[code]
+
+
+def decode_block(payload, start):
+    # Returns (keyframe bytes or None, [(tick, command), ...]) of one unpacked block
+    size, pos = read_varint(payload, 0)
+    keyframe = bytes(payload[pos:pos + size]) if size else None
+    pos += size
+    count, pos = read_varint(payload, pos)
+    commands = []
+    tick = start
+    for _ in range(count):
+        value, pos = read_varint(payload, pos)
+        tick += value >> 2
+        commands.append((tick, value & 3))
+    return keyframe, commands
+
+
+def unpack_block(unpack, packed, raw_size, start):
+    # Decompresses one block and checks it against the size recorded when it was written
+    payload = unpack(packed)
+    if len(payload) != raw_size:
+        raise ValueError(f'replay block at tick {start} is damaged')
+    return decode_block(payload, start)
+
+
+def iter_blocks(f):
+    # Streams a replay from a file object without seeking. Yields the InputLog (settings
+    # only) first, then (first tick, keyframe, commands) per block; the log's ticks and final
+    # score/lives are filled in once the last block has been read.
+    log, unpack = parse_header(f.read(HEADER.size))
+    yield log
+    while True:
+        start, raw_size, packed_size = BLOCK.unpack(f.read(BLOCK.size))
+        if start == END_BLOCK:
+            break
+        keyframe, commands = unpack_block(unpack, f.read(packed_size), raw_size, start)
+        yield start, keyframe, commands
+    log.ticks, log.final_score, log.final_lives = SUMMARY.unpack(f.read(SUMMARY.size))
+
+
+def read_replay(f):
+    blocks = iter_blocks(f)
+    log = next(blocks)
+    for start, keyframe, commands in blocks:
+        if keyframe is not None:
+            log.keyframes[start] = keyframe
+        log.commands.extend(commands)
+    return log
+
+
+class ReplayReader:
+    # Random access to a replay held in memory or memory-mapped (ReplayReader.open).
+    # Only the blocks that are asked for get decompressed.
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.log, self.unpack = parse_header(self.data[:HEADER.size])
+        index_offset, count, magic = TRAILER.unpack(self.data[-TRAILER.size:])
+        if magic != END_MAGIC:
+            raise ValueError('replay file is truncated')
+        self.index = [INDEX_ENTRY.unpack_from(self.data, index_offset + i * INDEX_ENTRY.size) for i in range(count)]
+        summary_offset = index_offset - SUMMARY.size
+        self.log.ticks, self.log.final_score, self.log.final_lives = SUMMARY.unpack_from(self.data, summary_offset)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def block(self, i):
+        start, offset, _ = self.index[i]
+        _, raw_size, packed_size = BLOCK.unpack_from(self.data, offset)
+        packed = self.data[offset + BLOCK.size:offset + BLOCK.size + packed_size]
+        return unpack_block(self.unpack, packed, raw_size, start)
+
+    def keyframes(self):
+        # (tick, decoded keyframe) for every keyframe in the file
+        for i, (start, _, has_keyframe) in enumerate(self.index):
+            if has_keyframe:
+                yield start, decode_keyframe(self.block(i)[0])
+
+    def seek(self, tick):
+        # Simulation state after `tick` ticks: restored from the nearest keyframe before it,
+        # then stepped forward with the recorded inputs
+        tick = min(tick, self.log.ticks)
+        first = 0
+        for i, (start, _, has_keyframe) in enumerate(self.index):
+            if start > tick:
+                break
+            if has_keyframe:
+                first = i
+        sim = self.log.new_simulation()
+        for i in range(first, len(self.index)):
+            keyframe, commands = self.block(i)
+            if i == first and keyframe is not None:
+                apply_keyframe(sim, keyframe)
+            for command_tick, command in commands:
+                if command_tick >= tick:
+                    break
+                while sim.tick < command_tick:
+                    sim.step()
+                sim.step(command)
+            if i + 1 == len(self.index) or self.index[i + 1][0] > tick:
+                break
+        while sim.tick < tick:
+            sim.step()
+        return sim
+
+
+def replay(log, render_every=0, on_tick=None):
+    # Re-runs the log and returns the finished Simulation. With render_every=N every Nth
+    # tick is drawn in the game window (no frame cap); on_tick(sim) is called after each tick.
+    sim = log.new_simulation()
+    commands = iter(log.commands)
+    next_tick, next_command = next(commands, (None, None))
+    draw = make_renderer(sim, log.level) if render_every else None
+    for tick in range(log.ticks):
+        command = None
+        if tick == next_tick:
+            command = next_command
+            next_tick, next_command = next(commands, (None, None))
+        sim.step(command)
+        if on_tick:
+            on_tick(sim)
+        if draw:
+            draw(sim, (tick + 1) % render_every == 0)
+    return sim
+
+
+def verify(log):
+    # True when replaying the log ends with the score and lives that were recorded
+    sim = replay(log)
+    return sim.score == log.final_score and sim.lives == log.final_lives
+
+
+def make_renderer(sim, level_num):
+    # pygame is only needed when frames are drawn
+    import pygame
+    import pacman
+
+    pacman.init_display()
+    layer = pacman.BoardLayer(sim)
+
+    def draw(sim, show):
+        # pellets are erased every tick so skipped frames do not leave them on the board
+        for tile in sim.eaten_tiles:
+            layer.erase(*tile)
+        if not show:
+            return
+        pygame.event.pump()
+        pacman.draw_board(sim, layer)
+        pacman.draw_player(sim)
+        pacman.draw_ghosts(sim)
+        pacman.draw_misc(sim, level_num)
+        pygame.display.flip()
+
+    return draw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay a recorded Pac-Man level.')
+    parser.add_argument('path', help='replay file written by play_level')
+    parser.add_argument('--render', type=int, default=0, metavar='N', help='draw every Nth tick')
+    parser.add_argument('--seek', type=int, metavar='TICK', help='only show the state at this tick')
+    args = parser.parse_args(argv)
+
+    if args.seek is not None:
+        sim = ReplayReader.open(args.path).seek(args.seek)
+        print(f'tick {sim.tick}: player at ({sim.player_x}, {sim.player_y}), score {sim.score}, lives {sim.lives}')
+        return
+    log = InputLog.load(args.path)
+    sim = replay(log, args.render)
+    match = sim.score == log.final_score and sim.lives == log.final_lives
+    print(f'{log.ticks} ticks, score {sim.score}, lives {sim.lives}'
+          f' ({"matches" if match else "does NOT match"} the recording)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1431 @@
+# Headless Pac-Man simulation core.
+# Holds the game rules that used to live inside pacman.play_level so a game can be
+# stepped without a window, an event queue or a frame-rate cap. pacman.py renders
+# on top of this module; bots, balancing scripts and regression checks can drive
+# Simulation.step() directly at full speed.
+import math
+import random
+from board import all_boards
+from pathfinding import REVERSE, SIDES, TILE_H, TILE_W, PathTable
+
+WIDTH = 900
+HEIGHT = 950
+
+PLAYER_START = (450, 663)
+# Ghost kinds, a kind picks the chase and flee targets, the classic move_* method and the look
+BLINKY, INKY, PINKY, CLYDE = 0, 1, 2, 3
+# (kind, x, y, direction) of the four ghosts every level starts with
+GHOST_ROSTER = [(BLINKY, 56, 58, 0), (INKY, 440, 388, 2), (PINKY, 440, 438, 2), (CLYDE, 440, 438, 2)]
+GHOST_STARTS = [(x, y, direct) for _, x, y, direct in GHOST_ROSTER]
+# extra ghosts (swarm mode) start on open tiles at least this many steps from the player
+SPAWN_DISTANCE = 12
+# side of the spatial hash cells, larger than a player plus ghost hitbox so 3x3 cells cover a hit
+HASH_CELL = 64
+
+# each level is 15% faster than the one before, the first LEVEL_BOARDS boards take turns
+LEVEL_SPEEDUP = 0.15
+LEVEL_BOARDS = 2
+
+
+def level_settings(level):
+    # (speed_mult, board_index) of a level number, for the game and the headless runners
+    speed_mult = 1.0 + (level - 1) * LEVEL_SPEEDUP
+    board_index = (level - 1) % LEVEL_BOARDS
+    return speed_mult, board_index
+
+
+POWER_TICKS = 600
+STARTUP_TICKS = 180
+# ghosts steer along shortest paths (Maze.paths); False brings back the original greedy
+# pixel comparisons of the move_* methods
+GHOST_PATHS = True
+# Swept movement: the player and ghosts run along lane centers and every tile center passed
+# within a tick is a junction, pellets are eaten on every tile passed and hits are found
+# between the start and end of the tick, so nothing is skipped however fast things move.
+# Ghosts always steer by Maze.paths then. Off by default: BatchSimulation plays the pixel rules.
+SWEPT_MOVES = False
+# swept hits: centers closer than this on both axes, the player's 40 px and a ghost's 36 px box
+HIT_REACH = 38
+# junction bit and pixel step of directions 0-R, 1-L, 2-U, 3-D
+DIRECTION_BITS = (1, 2, 4, 8)
+DIRECTION_STEPS = ((1, 0), (-1, 0), (0, -1), (0, 1))
+
+# bits of a junction table entry: which neighbours of a tile (and the tile itself) can be entered
+EXIT_RIGHT = 1
+EXIT_LEFT = 2
+EXIT_UP = 4
+EXIT_DOWN = 8
+EXIT_SELF = 16
+_NEIGHBOURS = ((EXIT_RIGHT, 0, 1), (EXIT_LEFT, 0, -1), (EXIT_UP, -1, 0), (EXIT_DOWN, 1, 0), (EXIT_SELF, 0, 0))
+
+
+def clip_to_screen(rect):
+    # pygame.draw.circle clips the rect it returns to the screen, collisions depended on that
+    x, y, w, h = rect
+    left = max(x, 0)
+    top = max(y, 0)
+    right = min(x + w, WIDTH)
+    bottom = min(y + h, HEIGHT)
+    if right <= left or bottom <= top:
+        return x + w // 2, y + h // 2, 0, 0
+    return left, top, right - left, bottom - top
+
+
+def player_hitbox(center_x, center_y):
+    return clip_to_screen((int(center_x) - 20, int(center_y) - 20, 40, 40))
+
+
+def ghost_hitbox(center_x, center_y):
+    return int(center_x - 18), int(center_y - 18), 36, 36
+
+
+def rects_collide(a, b):
+    # same rules as pygame.Rect.colliderect: empty rects never collide, touching edges don't count
+    if not a[2] or not a[3] or not b[2] or not b[3]:
+        return False
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class Maze:
+    # Walkability of one board compiled into junction tables. Eating pellets never changes
+    # what is walkable (0, 1 and 2 are all open), so a board is compiled once and shared.
+    # exits: open for the player and live ghosts, gate_exits: also through the ghost house
+    # gate (dead or boxed ghosts), gates: which of them are the gate itself. grid is the
+    # untouched board as one row-major bytes object that new levels are copied from.
+    # paths and gate_paths are the shortest path tables over exits and gate_exits.
+    __slots__ = ('rows', 'cols', 'exits', 'gate_exits', 'gates', 'grid', 'paths', 'gate_paths')
+
+    def __init__(self, level):
+        self.rows = len(level)
+        self.cols = len(level[0])
+        self.grid = bytes(tile for row in level for tile in row)
+        self.exits = self.junctions(level, lambda tile: tile < 3)
+        self.gate_exits = self.junctions(level, lambda tile: tile < 3 or tile == 9)
+        self.gates = self.junctions(level, lambda tile: tile == 9)
+        self.paths = PathTable(self.exits)
+        self.gate_paths = PathTable(self.gate_exits)
+
+    def junctions(self, level, is_open):
+        # neighbours wrap around the edges, like negative list indexes did in the probes
+        table = []
+        for row in range(self.rows):
+            table.append([])
+            for col in range(self.cols):
+                bits = 0
+                for bit, d_row, d_col in _NEIGHBOURS:
+                    if is_open(level[(row + d_row) % self.rows][(col + d_col) % self.cols]):
+                        bits |= bit
+                table[row].append(bits)
+        return table
+
+
+# compiled mazes keyed by board index
+mazes = {}
+
+
+def get_maze(board_index):
+    board_index %= len(all_boards)
+    if board_index not in mazes:
+        mazes[board_index] = Maze(all_boards[board_index])
+    return mazes[board_index]
+
+
+def swarm_roster(maze, count):
+    # Starts for count extra ghosts spread evenly over the open tiles far enough from the
+    # player, kinds taking turns. Always the same for a board, so replays stay exact.
+    if not count:
+        return []
+    paths = maze.paths
+    player = paths.field(*PLAYER_START)
+    tiles = []
+    for tile in range(paths.rows * paths.cols):
+        node = paths.node[tile]
+        if node >= 0 and SPAWN_DISTANCE <= player[node] < 0xFFFF:
+            row, col = divmod(tile, paths.cols)
+            # skip the ghost house
+            if not (340 < col * 30 - 7 < 560 and 340 < row * 28 - 8 < 500):
+                tiles.append(tile)
+    roster = []
+    for i in range(count):
+        row, col = divmod(tiles[i * len(tiles) // count if count <= len(tiles) else i % len(tiles)], paths.cols)
+        # top-left pixel that puts the ghost's center on the tile center
+        roster.append((i % 4, col * 30 - 7, row * 28 - 8, 0))
+    return roster
+
+
+class SpatialHash:
+    # Ghost ids bucketed by which HASH_CELL square their hitbox center is in, updated as the
+    # ghosts move. Only ghosts in the 3x3 cells around the player can touch its hitbox.
+    __slots__ = ('cells',)
+
+    def __init__(self, ghosts=()):
+        self.cells = {}
+        for ghost in ghosts:
+            ghost.cell = None
+            self.move(ghost)
+
+    def move(self, ghost):
+        cell = (int(ghost.center_x) // HASH_CELL, int(ghost.center_y) // HASH_CELL)
+        if cell != ghost.cell:
+            if ghost.cell is not None:
+                self.cells[ghost.cell].discard(ghost.id)
+            self.cells.setdefault(cell, set()).add(ghost.id)
+            ghost.cell = cell
+
+    def near(self, x, y, reach=HASH_CELL):
+        # ids of the ghosts whose center may be within reach of (x, y), in id order. The
+        # default covers the 3x3 cells that can touch a hitbox centered at (x, y).
+        found = []
+        for i in range(int(x - reach) // HASH_CELL, int(x + reach) // HASH_CELL + 1):
+            for j in range(int(y - reach) // HASH_CELL, int(y + reach) // HASH_CELL + 1):
+                bucket = self.cells.get((i, j))
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+
+def grid_rows(grid, cols):
+    # row views into a flat grid, so grid[row * cols + col] can also be read as level[row][col]
+    view = memoryview(grid)
+    return [view[start:start + cols] for start in range(0, len(grid), cols)]
+
+
+def probe_bits(center_x, center_y):
+    # The +/- 15 pixel probes land either on the entity's own tile or on a neighbour
+    # depending on where it is inside the tile. Returns the tile and the junction bit each
+    # probe refers to, computed with the same floor divisions the probes always used.
+    num1 = ((HEIGHT - 50) // 32)
+    num2 = (WIDTH // 30)
+    num3 = 15
+    row = int(center_y // num1)
+    col = int(center_x // num2)
+    right = EXIT_RIGHT if int((center_x + num3) // num2) != col else EXIT_SELF
+    left = EXIT_LEFT if int((center_x - num3) // num2) != col else EXIT_SELF
+    up = EXIT_UP if int((center_y - num3) // num1) != row else EXIT_SELF
+    down = EXIT_DOWN if int((center_y + num3) // num1) != row else EXIT_SELF
+    return row, col, right, left, up, down
+
+
+class Ghost:
+    # A ghost lives for the whole level and keeps its own position, direction and dead flag.
+    # prepare() refreshes the per-tick state (target, speed, turns, in_box, hitbox) before it moves.
+    __slots__ = ('x_pos', 'y_pos', 'center_x', 'center_y', 'target', 'speed', 'direction', 'dead',
+                 'in_box', 'id', 'kind', 'maze', 'turns', 'rect', 'cell')
+
+    def __init__(self, x_coord, y_coord, direct, id, maze, kind=None):
+        self.id = id
+        self.kind = id % 4 if kind is None else kind
+        self.maze = maze
+        # spatial hash cell, kept by SpatialHash
+        self.cell = None
+        self.reset(x_coord, y_coord, direct)
+        self.prepare((x_coord, y_coord), 2)
+
+    def reset(self, x_coord, y_coord, direct):
+        self.x_pos = x_coord
+        self.y_pos = y_coord
+        self.direction = direct
+        self.dead = False
+
+    def state(self):
+        return (self.x_pos, self.y_pos, self.center_x, self.center_y, self.target, self.speed, self.direction,
+                self.dead, self.in_box, tuple(self.turns), self.rect)
+
+    def restore(self, state):
+        (self.x_pos, self.y_pos, self.center_x, self.center_y, self.target, self.speed, self.direction,
+         self.dead, self.in_box, turns, self.rect) = state
+        self.turns = list(turns)
+
+    def prepare(self, target, speed):
+        self.center_x = self.x_pos + 22
+        self.center_y = self.y_pos + 22
+        self.target = target
+        self.speed = speed
+        # the box flag only matters for the gate checks and always starts the tick cleared
+        self.in_box = False
+        self.turns, self.in_box = self.check_collisions()
+        self.rect = ghost_hitbox(self.center_x, self.center_y)
+
+    def check_collisions(self):
+        # R, L, U, D
+        num1 = ((HEIGHT - 50) // 32)
+        self.turns = [False, False, False, False]
+        if 0 < self.center_x // 30 < 29:
+            row, col, right, left, up, down = probe_bits(self.center_x, self.center_y)
+            if self.in_box or self.dead:
+                exits = self.maze.gate_exits[row][col]
+            else:
+                exits = self.maze.exits[row][col]
+            # the gate can always be left upwards
+            if self.maze.gates[row][col] & up or exits & up:
+                self.turns[2] = True
+            if exits & left:
+                self.turns[1] = True
+            if exits & right:
+                self.turns[0] = True
+            if exits & down:
+                self.turns[3] = True
+
+            # vertical movers lined up with a row also look a full tile sideways
+            if self.direction == 2 or self.direction == 3:
+                if 10 <= self.center_y % num1 <= 20:
+                    if exits & EXIT_LEFT:
+                        self.turns[1] = True
+                    if exits & EXIT_RIGHT:
+                        self.turns[0] = True
+        else:
+            self.turns[0] = True
+            self.turns[1] = True
+        if 350 < self.x_pos < 550 and 370 < self.y_pos < 480:
+            self.in_box = True
+        else:
+            self.in_box = False
+        return self.turns, self.in_box
+
+    def move_clyde(self):
+        # r, l, u, d
+        # clyde is going to turn whenever advantageous for pursuit
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.direction = 1
+                self.x_pos -= self.speed
+            elif self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos - 30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_path(self, field=None):
+        # takes the open exit with the fewest steps left to the target, dead and boxed
+        # ghosts may use the gate; off the maze it falls back to clyde's greedy turns.
+        # field is the target's flow field when the caller already looked it up.
+        paths = self.maze.gate_paths if self.in_box or self.dead else self.maze.paths
+        if field is None:
+            field = paths.field(*self.target)
+        direction = paths.best_turn(self.center_x, self.center_y, field, self.turns, self.direction)
+        if direction is None:
+            return self.move_clyde()
+        self.direction = direction
+        if direction == 0:
+            self.x_pos += self.speed
+        elif direction == 1:
+            self.x_pos -= self.speed
+        elif direction == 2:
+            self.y_pos -= self.speed
+        else:
+            self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_swept(self, field=None):
+        # SWEPT_MOVES: at every tile center on the way takes the open exit with the fewest
+        # steps to the target, like move_path. Returns the sweep path for hit checks.
+        gate = self.in_box or self.dead
+        paths = self.maze.gate_paths if gate else self.maze.paths
+        if field is None:
+            field = paths.field(*self.target)
+
+        def choose(row, col, direction, bits):
+            turns = [bits & bit for bit in DIRECTION_BITS]
+            best = paths.best_turn(col * TILE_W + TILE_W // 2, row * TILE_H + TILE_H // 2, field, turns, direction)
+            if best is not None:
+                return best
+            # target out of reach: straight on, else any way but back, else back
+            for d in (direction, *SIDES[direction], REVERSE[direction]):
+                if turns[d]:
+                    return d
+            return direction
+
+        exits = self.maze.gate_exits if gate else self.maze.exits
+        center_x, center_y, self.direction, path, _ = sweep(exits, self.x_pos + 22, self.y_pos + 22, self.direction,
+                                                            self.speed, choose)
+        self.x_pos = center_x - 22
+        self.y_pos = center_y - 22
+        return path
+
+    def move_blinky(self):
+        # r, l, u, d
+        # blinky is going to turn whenever colliding with walls, otherwise continue straight
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[2]:
+                self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[3]:
+                self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos - 30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_inky(self):
+        # r, l, u, d
+        # inky turns up or down at any point to pursue, but left and right only on collision
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos - 30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_pinky(self):
+        # r, l, u, d
+        # inky is going to turn left or right whenever advantageous, but only up or down on collision
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.direction = 1
+                self.x_pos -= self.speed
+            elif self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos - 30
+        return self.x_pos, self.y_pos, self.direction
+
+
+# the chase each ghost kind uses in the classic movement
+CLASSIC_MOVES = [Ghost.move_blinky, Ghost.move_inky, Ghost.move_pinky, Ghost.move_clyde]
+
+
+def check_collisions(level, player_x, scor, power, power_count, eaten_ghosts, center_x, center_y):
+    num1 = (HEIGHT - 50) // 32
+    num2 = WIDTH // 30
+    eaten_tile = None
+    if 0 < player_x < 870:
+        if level[int(center_y // num1)][int(center_x // num2)] == 1:
+            level[int(center_y // num1)][int(center_x // num2)] = 0
+            scor += 10
+            eaten_tile = (int(center_y // num1), int(center_x // num2))
+        if level[int(center_y // num1)][int(center_x // num2)] == 2:
+            level[int(center_y // num1)][int(center_x // num2)] = 0
+            scor += 50
+            power = True
+            power_count = 0
+            eaten_ghosts = [False] * len(eaten_ghosts)
+            eaten_tile = (int(center_y // num1), int(center_x // num2))
+    return scor, power, power_count, eaten_ghosts, eaten_tile
+
+
+def check_position(maze, direction, centerx, centery):
+    turns = [False, False, False, False]
+    num1 = (HEIGHT - 50) // 32
+    num2 = (WIDTH // 30)
+    # check collisions based on center x and center y of player +/- fudge number
+    if centerx // 30 < 29:
+        row, col, right, left, up, down = probe_bits(centerx, centery)
+        exits = maze.exits[row][col]
+        if direction == 0:
+            if exits & left:
+                turns[1] = True
+        if direction == 1:
+            if exits & right:
+                turns[0] = True
+        if direction == 2:
+            if exits & down:
+                turns[3] = True
+        if direction == 3:
+            if exits & up:
+                turns[2] = True
+
+        if 10 <= centerx % num2 <= 20:
+            if exits & down:
+                turns[3] = True
+            if exits & up:
+                turns[2] = True
+        if 10 <= centery % num1 <= 20:
+            if direction == 2 or direction == 3:
+                if exits & EXIT_LEFT:
+                    turns[1] = True
+                if exits & EXIT_RIGHT:
+                    turns[0] = True
+            else:
+                if exits & left:
+                    turns[1] = True
+                if exits & right:
+                    turns[0] = True
+    else:
+        turns[0] = True
+        turns[1] = True
+
+    return turns
+
+
+def move_player(play_x, play_y, direction, turns_allowed, player_speed):
+    # r, l, u, d
+    if direction == 0 and turns_allowed[0]:
+        play_x += player_speed
+    elif direction == 1 and turns_allowed[1]:
+        play_x -= player_speed
+    if direction == 2 and turns_allowed[2]:
+        play_y -= player_speed
+    elif direction == 3 and turns_allowed[3]:
+        play_y += player_speed
+    return play_x, play_y
+
+
+def sweep(exits, center_x, center_y, direction, distance, choose):
+    # SWEPT_MOVES: moves a center distance pixels along the lanes of a junction table. At
+    # every tile center reached, choose(row, col, direction, bits) picks the way on, and a
+    # closed way stops the center there for the rest of the tick. Returns the end point and
+    # direction, the path as (fraction of the tick, x, y) corners and the tiles passed. x
+    # is wrapped around the tunnel at the end only, so the path stays continuous.
+    rows = len(exits)
+    cols = len(exits[0])
+    # onto the middle of the lane
+    if direction < 2:
+        center_y = center_y // TILE_H * TILE_H + TILE_H // 2
+    else:
+        center_x = center_x // TILE_W * TILE_W + TILE_W // 2
+    path = [(0.0, center_x, center_y)]
+    tiles = [(int(center_y // TILE_H) % rows, int(center_x // TILE_W) % cols)]
+    travelled = 0
+    while travelled < distance:
+        step_x, step_y = DIRECTION_STEPS[direction]
+        size = TILE_W if step_x else TILE_H
+        col = int(center_x // TILE_W)
+        row = int(center_y // TILE_H)
+        # pixels to the next tile center ahead, 0 when standing on one
+        gap = (col * TILE_W + TILE_W // 2 - center_x) * step_x + (row * TILE_H + TILE_H // 2 - center_y) * step_y
+        if gap < 0:
+            gap += size
+        if gap > distance - travelled:
+            gap = distance - travelled
+            center_x += gap * step_x
+            center_y += gap * step_y
+            break
+        travelled += gap
+        if step_x:
+            center_x = int((center_x + gap * step_x) // TILE_W) * TILE_W + TILE_W // 2
+        else:
+            center_y = int((center_y + gap * step_y) // TILE_H) * TILE_H + TILE_H // 2
+        row = int(center_y // TILE_H) % rows
+        col = int(center_x // TILE_W) % cols
+        if tiles[-1] != (row, col):
+            tiles.append((row, col))
+        bits = exits[row][col]
+        turn = choose(row, col, direction, bits)
+        if turn != direction:
+            path.append((travelled / distance, center_x, center_y))
+            direction = turn
+        if not bits & DIRECTION_BITS[direction]:
+            # standing still from here on
+            path.append((travelled / distance, center_x, center_y))
+            break
+        # leave the center, the next pass stops at the following one
+        step_x, step_y = DIRECTION_STEPS[direction]
+        gap = min(TILE_W if step_x else TILE_H, distance - travelled)
+        travelled += gap
+        center_x += gap * step_x
+        center_y += gap * step_y
+        tile = (int(center_y // TILE_H) % rows, int(center_x // TILE_W) % cols)
+        if tiles[-1] != tile:
+            tiles.append(tile)
+    path.append((1.0, center_x, center_y))
+    tile = (int(center_y // TILE_H) % rows, int(center_x // TILE_W) % cols)
+    if tiles[-1] != tile:
+        tiles.append(tile)
+    return center_x % WIDTH, center_y, direction, path, tiles
+
+
+def path_point(path, t):
+    # where a sweep path is at fraction t of the tick
+    for (t0, x0, y0), (t1, x1, y1) in zip(path, path[1:]):
+        if t <= t1:
+            share = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+            return x0 + (x1 - x0) * share, y0 + (y1 - y0) * share
+    return path[-1][1], path[-1][2]
+
+
+def axis_overlap(start, change, reach):
+    # part of [0, 1] where |start + change * u| < reach, as (low, high)
+    if not change:
+        return (0.0, 1.0) if abs(start) < reach else (1.0, 0.0)
+    low = (-reach - start) / change
+    high = (reach - start) / change
+    if low > high:
+        low, high = high, low
+    return max(low, 0.0), min(high, 1.0)
+
+
+def paths_meet(a, b, reach=HIT_REACH):
+    # True when two sweep paths of the same tick come closer than reach on both axes at
+    # some moment. The relative motion is a straight line between the corners of either.
+    shift = round((a[0][1] - b[0][1]) / WIDTH) * WIDTH  # b on the same side of the tunnel
+    times = sorted({t for t, _, _ in a} | {t for t, _, _ in b})
+    for t0, t1 in zip(times, times[1:]):
+        ax0, ay0 = path_point(a, t0)
+        bx0, by0 = path_point(b, t0)
+        ax1, ay1 = path_point(a, t1)
+        bx1, by1 = path_point(b, t1)
+        dx = ax0 - bx0 - shift
+        dy = ay0 - by0
+        low_x, high_x = axis_overlap(dx, ax1 - bx1 - shift - dx, reach)
+        low_y, high_y = axis_overlap(dy, ay1 - by1 - dy, reach)
+        if max(low_x, low_y) < min(high_x, high_y):
+            return True
+    return False
+
+
+def get_targets(player_x, player_y, powerup, eaten_ghost, ghosts):
+    if player_x < 450:
+        runaway_x = 900
+    else:
+        runaway_x = 0
+    if player_y < 450:
+        runaway_y = 900
+    else:
+        runaway_y = 0
+    return_target = (380, 400)
+    chase = (player_x, player_y)
+    # where each kind runs to during a power-up: blinky, inky, pinky, clyde
+    flee = [(runaway_x, runaway_y), (runaway_x, player_y), (player_x, runaway_y), (450, 450)]
+    targets = []
+    for ghost in ghosts:
+        if ghost.dead:
+            targets.append(return_target)
+        # pinky keeps fleeing after being eaten
+        elif powerup and (not eaten_ghost[ghost.id] or ghost.kind == PINKY):
+            targets.append(flee[ghost.kind])
+        elif 340 < ghost.x_pos < 560 and 340 < ghost.y_pos < 500:
+            targets.append((400, 100))
+        else:
+            targets.append(chase)
+    return targets
+
+
+def randomize_bonuses(level_grid, rng=random):
+    # Find all positions of small dots (1) and power pellets (2)
+    small_dots = []
+    power_pellets = []
+    
+    for r in range(len(level_grid)):
+        for c in range(len(level_grid[r])):
+            if level_grid[r][c] == 1:
+                small_dots.append((r, c))
+            elif level_grid[r][c] == 2:
+                power_pellets.append((r, c))
+    
+    # Randomly swap power pellets with small dots
+    # We want to keep the number of power pellets constant, just move them
+    # But we can also just pick random positions from the combined list of valid spots
+    
+    # Let's just shuffle the power pellets into new positions from the available dot spots
+    # First, turn existing power pellets into small dots
+    for r, c in power_pellets:
+        level_grid[r][c] = 1
+        small_dots.append((r, c))
+
+    # Now pick random spots for power pellets with minimum distance
+    for r, c in bonus_spots(small_dots, len(power_pellets), rng):
+        level_grid[r][c] = 2
+
+
+def bonus_spots(small_dots, count, rng=random):
+    # Picks count power pellet spots out of small_dots, which gets shuffled in place.
+    # Split out of randomize_bonuses so BatchSimulation can place pellets for many lanes
+    # without copying the board each time; the rng calls are exactly the same.
+    chosen_spots = []
+    if small_dots:
+        min_distance = 10  # Minimum tile distance between power pellets
+        
+        for _ in range(count):
+            # Try to find a spot that is far enough from existing chosen spots
+            valid_spot = None
+            rng.shuffle(small_dots)
+            
+            for spot in small_dots:
+                if spot in chosen_spots:
+                    continue
+                    
+                # Check distance to all currently chosen spots
+                too_close = False
+                for existing in chosen_spots:
+                    dist = math.sqrt((spot[0] - existing[0])**2 + (spot[1] - existing[1])**2)
+                    if dist < min_distance:
+                        too_close = True
+                        break
+                
+                if not too_close:
+                    valid_spot = spot
+                    break
+            
+            # If we couldn't find a spot far enough (e.g. map too small), just pick a random available one
+            if valid_spot is None:
+                remaining = [s for s in small_dots if s not in chosen_spots]
+                if remaining:
+                    valid_spot = rng.choice(remaining)
+            
+            if valid_spot:
+                chosen_spots.append(valid_spot)
+    return chosen_spots
+
+
+class Snapshot:
+    # Frozen state of a Simulation, see Simulation.snapshot(). grid is an immutable copy of
+    # the board that every snapshot taken while no pellet was eaten shares.
+    __slots__ = ('grid', 'state', 'ghosts')
+
+    def __init__(self, grid, state, ghosts):
+        self.grid = grid
+        self.state = state
+        self.ghosts = ghosts
+
+
+class Simulation:
+    """A single level of Pac-Man with no display attached.
+
+    step() advances the game by one tick (one frame at 60 FPS) and returns the
+    simulation so callers can read player, ghost, grid, score and lives state.
+    snapshot() / restore() save and rewind the whole level, fork() makes an
+    independent copy, e.g. for bots searching ahead.
+
+    The board is a bytearray (grid, row-major) with level[row][col] row views
+    into it, so copying or restoring it is a single buffer copy.
+
+    swept picks the SWEPT_MOVES movement for this level (None: the module setting).
+    """
+    __slots__ = ('board_index', 'speed_mult', 'seed', 'swept', 'rng', 'grid', 'grid_bytes', 'level', 'maze', 'score',
+                 'lives', 'tick', 'counter', 'flicker', 'player_speed', 'turns_allowed', 'powerup', 'power_counter',
+                 'startup_counter', 'moving', 'game_over', 'game_won', 'eaten_tiles', 'roster', 'ghosts',
+                 'ghost_hash', 'targets', 'player_x', 'player_y', 'direction', 'direction_command', 'eaten_ghost')
+
+    def __init__(self, board_index=0, speed_mult=1.0, lives=3, score=0, seed=None, extra_ghosts=0, swept=None):
+        self.board_index = board_index
+        self.speed_mult = speed_mult
+        self.seed = seed
+        self.swept = SWEPT_MOVES if swept is None else swept
+        self.rng = random.Random(seed)
+        self.maze = get_maze(board_index)
+        self.grid = bytearray(self.maze.grid)
+        self.level = grid_rows(self.grid, self.maze.cols)
+        randomize_bonuses(self.level, self.rng)
+        # bytes copy of grid handed out by snapshot(), dropped whenever a pellet is eaten
+        self.grid_bytes = None
+        self.score = score
+        self.lives = lives
+        self.tick = 0
+        self.counter = 0
+        self.flicker = False
+        self.player_speed = 2
+        self.turns_allowed = [False, False, False, False]
+        self.powerup = False
+        self.power_counter = 0
+        self.startup_counter = 0
+        self.moving = False
+        self.game_over = False
+        self.game_won = False
+        # (row, col) of every pellet eaten in the last tick
+        self.eaten_tiles = []
+        # blinky, inky, pinky, clyde and the swarm
+        self.roster = GHOST_ROSTER + swarm_roster(self.maze, extra_ghosts)
+        self.ghosts = [Ghost(x, y, direct, i, self.maze, kind) for i, (kind, x, y, direct) in enumerate(self.roster)]
+        self.ghost_hash = SpatialHash(self.ghosts)
+        self.reset_positions()
+        self.targets = [(self.player_x, self.player_y)] * len(self.ghosts)
+
+    def snapshot(self):
+        if self.grid_bytes is None:
+            self.grid_bytes = bytes(self.grid)
+        state = (self.score, self.lives, self.tick, self.counter, self.flicker, tuple(self.turns_allowed),
+                 self.powerup, self.power_counter, self.startup_counter, self.moving, self.game_over,
+                 self.game_won, tuple(self.eaten_tiles), tuple(self.targets), self.player_x, self.player_y,
+                 self.direction, self.direction_command, tuple(self.eaten_ghost))
+        return Snapshot(self.grid_bytes, state, tuple(ghost.state() for ghost in self.ghosts))
+
+    def restore(self, snapshot):
+        # snapshots can be restored any number of times, into any Simulation of the same board
+        if self.grid_bytes is not snapshot.grid:
+            self.grid[:] = snapshot.grid
+            self.grid_bytes = snapshot.grid
+        (self.score, self.lives, self.tick, self.counter, self.flicker, turns_allowed, self.powerup,
+         self.power_counter, self.startup_counter, self.moving, self.game_over, self.game_won, eaten_tiles,
+         targets, self.player_x, self.player_y, self.direction, self.direction_command,
+         eaten_ghost) = snapshot.state
+        self.turns_allowed = list(turns_allowed)
+        self.eaten_tiles = list(eaten_tiles)
+        self.targets = list(targets)
+        self.eaten_ghost = list(eaten_ghost)
+        for ghost, state in zip(self.ghosts, snapshot.ghosts):
+            ghost.restore(state)
+            self.ghost_hash.move(ghost)
+        return self
+
+    def fork(self):
+        # an independent Simulation in the same state, without rebuilding the level
+        clone = Simulation.__new__(Simulation)
+        clone.board_index = self.board_index
+        clone.speed_mult = self.speed_mult
+        clone.seed = self.seed
+        clone.swept = self.swept
+        clone.rng = self.rng
+        clone.maze = self.maze
+        clone.roster = self.roster
+        clone.ghost_hash = SpatialHash()
+        clone.player_speed = self.player_speed
+        clone.grid = bytearray(len(self.grid))
+        clone.grid_bytes = None
+        clone.level = grid_rows(clone.grid, self.maze.cols)
+        clone.ghosts = []
+        for ghost in self.ghosts:
+            copy = Ghost.__new__(Ghost)
+            copy.id = ghost.id
+            copy.kind = ghost.kind
+            copy.maze = ghost.maze
+            copy.cell = None
+            clone.ghosts.append(copy)
+        return clone.restore(self.snapshot())
+
+    def reset_positions(self):
+        self.player_x, self.player_y = PLAYER_START
+        self.direction = 0
+        self.direction_command = 0
+        for ghost, (_, x, y, direct) in zip(self.ghosts, self.roster):
+            ghost.reset(x, y, direct)
+        self.eaten_ghost = [False] * len(self.ghosts)
+        if self.swept:
+            # swept moves keep everyone on tile centers, start there too
+            self.player_x = (self.player_x + 23) // TILE_W * TILE_W + TILE_W // 2 - 23
+            self.player_y = (self.player_y + 24) // TILE_H * TILE_H + TILE_H // 2 - 24
+            for ghost in self.ghosts:
+                ghost.x_pos = (ghost.x_pos + 22) // TILE_W * TILE_W + TILE_W // 2 - 22
+                ghost.y_pos = (ghost.y_pos + 22) // TILE_H * TILE_H + TILE_H // 2 - 22
+
+    def move_ghosts_classic(self):
+        # each kind's own move_* method, dead and boxed ghosts all move like clyde
+        for ghost in self.ghosts:
+            if ghost.dead or ghost.in_box:
+                ghost.move_clyde()
+            else:
+                CLASSIC_MOVES[ghost.kind](ghost)
+
+    def step_swept(self, command, center_x, center_y):
+        # the rest of step() with SWEPT_MOVES: every part of the tick is looked at, not
+        # just where things stand when it starts
+        # ghosts that can reach the player's path before the tick is over
+        reach = HIT_REACH + self.player_speed + 4 * self.speed_mult
+        near = [self.ghosts[i] for i in self.ghost_hash.near(center_x, center_y, reach)]
+        was_dead = {ghost.id: ghost.dead for ghost in near}
+
+        self.game_won = 1 not in self.grid and 2 not in self.grid
+        self.targets = get_targets(self.player_x, self.player_y, self.powerup, self.eaten_ghost, self.ghosts)
+        playing = not self.game_over and not self.game_won
+        if command is not None and playing:
+            self.direction_command = command
+        # turning back never has to wait for a junction
+        if self.direction_command == REVERSE[self.direction]:
+            self.direction = self.direction_command
+
+        def choose(row, col, direction, bits):
+            return self.direction_command if bits & DIRECTION_BITS[self.direction_command] else direction
+
+        distance = self.player_speed if self.moving and playing else 0
+        end_x, end_y, self.direction, player_path, tiles = sweep(self.maze.exits, center_x, center_y,
+                                                                self.direction, distance, choose)
+        self.player_x = end_x - 23
+        self.player_y = end_y - 24
+        paths = {}
+        if distance:
+            fields = {}
+            for ghost in self.ghosts:
+                key = (ghost.in_box or ghost.dead, ghost.target)
+                field = fields.get(key)
+                if field is None:
+                    table = self.maze.gate_paths if key[0] else self.maze.paths
+                    field = fields[key] = table.field(*ghost.target)
+                paths[ghost.id] = ghost.move_swept(field)
+
+        # every tile the player went through, check_collisions looks at tile centers
+        self.eaten_tiles = []
+        for row, col in tiles:
+            tile_x = col * TILE_W + TILE_W // 2
+            tile_y = row * TILE_H + TILE_H // 2
+            self.score, self.powerup, self.power_counter, self.eaten_ghost, eaten_tile = check_collisions(
+                self.level, tile_x - 23, self.score, self.powerup, self.power_counter, self.eaten_ghost,
+                tile_x, tile_y)
+            if eaten_tile:
+                self.eaten_tiles.append(eaten_tile)
+                self.grid_bytes = None
+
+        touching = []
+        for ghost in near:
+            ghost_path = paths.get(ghost.id)
+            if ghost_path is None:
+                ghost_path = [(0.0, ghost.center_x, ghost.center_y), (1.0, ghost.center_x, ghost.center_y)]
+            if paths_meet(player_path, ghost_path):
+                touching.append(ghost)
+        self.ghost_hits(touching, was_dead)
+
+        # open ways of the tile the player is on, for bots reading turns_allowed
+        row, col = tiles[-1]
+        self.turns_allowed = [bool(self.maze.exits[row][col] & bit) for bit in DIRECTION_BITS]
+        for ghost in self.ghosts:
+            if ghost.in_box and ghost.dead:
+                ghost.dead = False
+
+    def ghost_hits(self, touching, was_dead):
+        # touching: the ghosts whose hitbox met the player's this tick, in id order
+        if not self.powerup:
+            for ghost in touching:
+                if not was_dead[ghost.id]:
+                    self.player_caught()
+                    break
+        for ghost in touching:
+            if self.powerup and self.eaten_ghost[ghost.id] and not was_dead[ghost.id]:
+                self.player_caught()
+        for ghost in touching:
+            if self.powerup and not was_dead[ghost.id] and not self.eaten_ghost[ghost.id]:
+                ghost.dead = True
+                self.eaten_ghost[ghost.id] = True
+                # 200, 400, 800, 1600 and 1600 for every ghost after that
+                self.score += (2 ** min(self.eaten_ghost.count(True), 4)) * 100
+
+    def player_caught(self):
+        if self.lives > 0:
+            self.lives -= 1
+            self.startup_counter = 0
+            self.powerup = False
+            self.power_counter = 0
+            self.reset_positions()
+        else:
+            self.game_over = True
+            self.moving = False
+            self.startup_counter = 0
+
+    def step(self, command=None):
+        # command is the queued direction (0-R, 1-L, 2-U, 3-D) or None to keep the current one
+        self.tick += 1
+        if self.counter < 19:
+            self.counter += 1
+            if self.counter > 3:
+                self.flicker = False
+        else:
+            self.counter = 0
+            self.flicker = True
+        if self.powerup and self.power_counter < POWER_TICKS:
+            self.power_counter += 1
+        elif self.powerup and self.power_counter >= POWER_TICKS:
+            self.power_counter = 0
+            self.powerup = False
+            self.eaten_ghost = [False] * len(self.ghosts)
+        if self.startup_counter < STARTUP_TICKS and not self.game_over and not self.game_won:
+            self.moving = False
+            self.startup_counter += 1
+        elif self.game_over or self.game_won:
+            self.moving = False
+        else:
+            self.moving = True
+
+        center_x = self.player_x + 23
+        center_y = self.player_y + 24
+
+        # Adjust speeds based on level multiplier
+        base_speed = 2 * self.speed_mult
+        for ghost in self.ghosts:
+            speed = 1 * self.speed_mult if self.powerup else base_speed
+            if self.eaten_ghost[ghost.id]:
+                speed = base_speed
+            if ghost.dead:
+                speed = 4 * self.speed_mult
+            ghost.prepare(self.targets[ghost.id], speed)
+            self.ghost_hash.move(ghost)
+        if self.swept:
+            self.step_swept(command, center_x, center_y)
+            return self
+        # only ghosts near the player can touch it, collisions below are judged on their
+        # hitboxes and on who was dead when the tick started
+        near = [self.ghosts[i] for i in self.ghost_hash.near(center_x, center_y)]
+        was_dead = {ghost.id: ghost.dead for ghost in near}
+
+        player_circle = player_hitbox(center_x, center_y)
+
+        self.game_won = 1 not in self.grid and 2 not in self.grid
+
+        self.targets = get_targets(self.player_x, self.player_y, self.powerup, self.eaten_ghost, self.ghosts)
+        self.turns_allowed = check_position(self.maze, self.direction, center_x, center_y)
+        # Stop movement if game is over or won
+        if self.moving and not self.game_over and not self.game_won:
+            self.player_x, self.player_y = move_player(self.player_x, self.player_y, self.direction,
+                                                       self.turns_allowed, self.player_speed)
+            if GHOST_PATHS:
+                # one flow field per distinct target and tick, however many ghosts chase it
+                fields = {}
+                for ghost in self.ghosts:
+                    key = (ghost.in_box or ghost.dead, ghost.target)
+                    field = fields.get(key)
+                    if field is None:
+                        paths = self.maze.gate_paths if key[0] else self.maze.paths
+                        field = fields[key] = paths.field(*ghost.target)
+                    ghost.move_path(field)
+            else:
+                self.move_ghosts_classic()
+        self.score, self.powerup, self.power_counter, self.eaten_ghost, eaten_tile = check_collisions(
+            self.level, self.player_x, self.score, self.powerup, self.power_counter, self.eaten_ghost,
+            center_x, center_y)
+        self.eaten_tiles = [eaten_tile] if eaten_tile else []
+        if eaten_tile:
+            self.grid_bytes = None
+
+        self.ghost_hits([ghost for ghost in near if rects_collide(player_circle, ghost.rect)], was_dead)
+
+        if command is not None and not self.game_over and not self.game_won:
+            self.direction_command = command
+        if self.direction_command == 0 and self.turns_allowed[0]:
+            self.direction = 0
+        if self.direction_command == 1 and self.turns_allowed[1]:
+            self.direction = 1
+        if self.direction_command == 2 and self.turns_allowed[2]:
+            self.direction = 2
+        if self.direction_command == 3 and self.turns_allowed[3]:
+            self.direction = 3
+
+        if self.player_x > 900:
+            self.player_x = -47
+        elif self.player_x < -50:
+            self.player_x = 897
+
+        for ghost in self.ghosts:
+            if ghost.in_box and ghost.dead:
+                ghost.dead = False
+        return self